@@ -34,9 +34,13 @@ class OcrParserService
             $scriptCmd = escapeshellarg($this->scriptPath);
             $pdfCmd = escapeshellarg($absolutePath);
             $outputCmd = escapeshellarg($outputPath);
+
+            // Checkpoints are keyed by the PDF's hash, so a restarted job resumes
+            // a large statement where the killed run stopped
+            $checkpointCmd = escapeshellarg(storage_path('app/parse_checkpoints'));
             
             // Construct command without extra quotes since escapeshellarg already adds them
-            $command = "{$pythonCmd} {$scriptCmd} {$pdfCmd} --output {$outputCmd} 2>&1";
+            $command = "{$pythonCmd} {$scriptCmd} {$pdfCmd} --output {$outputCmd} --checkpoint-dir {$checkpointCmd} 2>&1";
 
             Log::info("Executing OCR parser", [
                 'command' => $command,
@@ -77,7 +77,7 @@ for pdf_file in sorted(Path('storage/app/statements').glob('*.pdf')):
                     'new_count': new_count,
                     'difference': diff,
                     'current_total_credits': current_stmt['total_credits'],
-                    'new_total_credits': sum(t.get('credit', 0) for t in parsed_transactions)
+                    'new_total_credits': sum(float(t.get('credit') or 0) for t in parsed_transactions)
                 })
             else:
                 print(f"   ✅ SAME COUNT")
@@ -0,0 +1,157 @@
+"""
+Bank statement profiles
+Each bank's column titles, header/footer anchors, transaction and continuation
+markers and date/amount formats live in a JSON file under bank_profiles/.
+Profiles are compiled once at load into keyword tuples and regexes, so the row
+parsers only run lookups; onboarding a bank is a new data file.
+"""
+
+import json
+import os
+import re
+
+from keyword_classifier import KeywordClassifier
+
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bank_profiles')
+
+# Profile used for statements no profile's fingerprints match
+DEFAULT_BANK_PROFILE = 'equity'
+
+# Keyword category -> the profile field listing its keywords
+KEYWORD_CATEGORIES = {
+    'table_header': 'table_header_keywords',
+    'text_header': 'text_header_keywords',
+    'footer': 'footer_keywords',
+    'footer_anchor': 'footer_anchors',
+    'footer_line': 'footer_line_keywords',
+    'summary': 'summary_keywords',
+    'closing': 'closing_keywords',
+    'closing_anchor': 'closing_anchors',
+    'balance_indicator': 'balance_indicators',
+    'balance_context': 'balance_context_keywords',
+}
+
+
+def keyword_tuple(words):
+    """Upper-cased keywords, for substring tests against upper-cased text"""
+    return tuple(word.upper() for word in words)
+
+
+def keyword_regex(words):
+    """One alternation regex that finds any of the literal keywords (for short cells)"""
+    return re.compile('|'.join(re.escape(word) for word in words))
+
+
+def column_rules(rules):
+    """Compile ``{"role", "any", "all", "unless"}`` column rules into keyword tuples"""
+    return [
+        (
+            rule['role'],
+            keyword_tuple(rule.get('any', [])),
+            keyword_tuple(rule.get('all', [])),
+            keyword_tuple(rule.get('unless', [])),
+        )
+        for rule in rules
+    ]
+
+
+def match_column_rules(rules, header_cell):
+    """Role of a column from its upper-cased header label; the first matching rule decides"""
+    for role, any_of, all_of, unless in rules:
+        if any_of and not any(keyword in header_cell for keyword in any_of):
+            continue
+        if not all(keyword in header_cell for keyword in all_of):
+            continue
+        if any(keyword in header_cell for keyword in unless):
+            return None
+        return role
+    return None
+
+
+def prefix_regex(patterns, flags=re.IGNORECASE):
+    """One regex that matches when any of the patterns starts the string"""
+    return re.compile('(?:' + '|'.join(f'(?:{pattern})' for pattern in patterns) + ')', flags)
+
+
+class BankProfile:
+    """A bank's statement layout, compiled from its profile data file.
+
+    The keyword lists that classify whole lines and rows become categories of
+    one ``KeywordClassifier`` (``keywords``), so a line is scanned once for all
+    of them. Keyword lists tested against single table cells become one
+    alternation regex each, and patterns are precompiled.
+    """
+
+    def __init__(self, spec):
+        self.name = spec['name']
+        self.fingerprints = [keyword_tuple(group) for group in spec.get('fingerprints', [])]
+        self.columns = column_rules(spec['columns'])
+        # Column roles of the words engine, from the labels above each column band
+        self.word_columns = column_rules(spec['word_columns'])
+
+        self.date_re = re.compile(spec['date_pattern'])
+        self.date_word_re = re.compile(r'\b' + spec['date_pattern'] + r'\b')
+        self.amount_re = re.compile(spec['amount_pattern'])
+        self.date_formats = tuple(spec['date_formats'])
+
+        self.column_titles_re = re.compile(
+            r'\b(' + '|'.join(re.escape(title) for title in spec['column_titles']) + r')\b', re.IGNORECASE
+        )
+        self.particulars_titles = frozenset(keyword_tuple(spec['particulars_titles']))
+        self.table_header_marker_re = keyword_regex(keyword_tuple(spec['table_header_markers']))
+        self.amount_titles_re = keyword_regex(keyword_tuple(spec['amount_titles']))
+        self.label_cells_re = keyword_regex(keyword_tuple(spec['label_cells']))
+        self.excluded_amount_labels_re = keyword_regex(keyword_tuple(spec['excluded_amount_labels']))
+        self.merge_stop_re = keyword_regex(keyword_tuple(spec['merge_stop_keywords']))
+        self.empty_amount_cells = frozenset(keyword_tuple(spec['empty_amount_cells']))
+
+        self.grand_total_anchor = spec['grand_total_anchor'].upper()
+        self.total_anchor = spec['total_anchor'].upper()
+        self.footer_strip_res = [
+            re.compile(pattern, re.IGNORECASE | re.DOTALL) for pattern in spec['footer_strip_patterns']
+        ]
+        self.implausible_credit = spec['implausible_credit']
+
+        # Page layout: the header word that tops the transaction table and the
+        # word that starts the page footer (body cropping); the header words
+        # that locate the column header row and the line starts that end the
+        # transaction body (words engine)
+        self.body_header_anchor = spec['body_header_anchor'].upper()
+        self.body_footer_anchor = spec['body_footer_anchor'].upper()
+        self.column_header_anchors = frozenset(keyword_tuple(spec['column_header_anchors']))
+        self.word_footer_anchors = keyword_tuple(spec['word_footer_anchors'])
+
+        # Keyword categories, each counted in one scan (see KeywordClassifier.scan)
+        categories = {category: keyword_tuple(spec[field]) for category, field in KEYWORD_CATEGORIES.items()}
+        categories['grand_total'] = (self.grand_total_anchor,)
+        self.keywords = KeywordClassifier(categories)
+
+        # A cell or line opening with one of these starts a new transaction
+        self.transaction_marker_re = prefix_regex(spec['transaction_markers'])
+        self.boundary_marker_re = prefix_regex(spec['transaction_markers'] + [spec['reference_code_pattern']])
+        self.merged_row_res = [re.compile(pattern) for pattern in spec['merged_row_markers']]
+        self.continuation_prefixes = keyword_tuple(spec['continuation_prefixes'])
+
+    def matches(self, upper_text):
+        """Whether every keyword of any one fingerprint appears in the upper-cased text"""
+        return any(all(keyword in upper_text for keyword in group) for group in self.fingerprints)
+
+    def column_role(self, header_cell):
+        """Role of a table column from its upper-cased header label; the first matching rule decides"""
+        return match_column_rules(self.columns, header_cell)
+
+    def word_column_role(self, header_label):
+        """Role of a words-engine column band from its upper-cased header label, None if no rule matches"""
+        return match_column_rules(self.word_columns, header_label)
+
+
+def load_bank_profiles(directory=PROFILE_DIR):
+    """Compile every ``*.json`` profile in ``directory``, keyed by profile name"""
+    profiles = {}
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith('.json'):
+            continue
+        with open(os.path.join(directory, name), encoding='utf-8') as f:
+            profile = BankProfile(json.load(f))
+        profiles[profile.name] = profile
+    return profiles
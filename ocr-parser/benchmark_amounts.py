@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Amount scanner benchmark
+Collects two token corpora from real statements - the amount-like tokens of each page's text, which
+detect_table_rows classifies (currency? phone number?) and values, and every table cell, which the
+table parsers run through parse_amount - and times the single-pass scanner used by parse_pdf.py
+against the per-check parsing it replaced, checking both agree on every token.
+
+Usage: python benchmark_amounts.py <pdf_path> [<pdf_path> ...] [--pages N] [--repeat N]
+"""
+
+import argparse
+import re
+import sys
+import time
+
+import pdfplumber
+
+from parse_pdf import (
+    TOKEN_CURRENCY,
+    TOKEN_PHONE,
+    bank_profile_for,
+    parse_amount,
+    scan_amount_token,
+)
+
+
+def legacy_parse_amount(amount_str):
+    """parse_amount as it was: date regex, two substitutions, a validation regex, float and round()"""
+    if not amount_str:
+        return None
+    amount_str = str(amount_str).strip()
+    if re.search(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}', amount_str):
+        return None
+    if len(amount_str) > 25:
+        return None
+    cleaned = amount_str.replace(',', '').replace(' ', '')
+    cleaned = re.sub(r'[^\d.]', '', cleaned)
+    if not cleaned or not re.search(r'\d', cleaned):
+        return None
+    if not re.match(r'^\d+\.?\d{0,2}$', cleaned):
+        return None
+    value = float(cleaned)
+    if value > 1000000000 or value <= 0:
+        return None
+    return round(value, 2)
+
+
+def legacy_looks_like_currency(amount_str):
+    """detect_table_rows' currency check as it was"""
+    amount_str = amount_str.strip()
+    has_decimal = amount_str.count('.') == 1
+    has_comma = ',' in amount_str
+    if not has_decimal and not has_comma:
+        return False
+    if has_decimal:
+        integer_part, decimal_part = amount_str.split('.', 1)
+        if not decimal_part.isdigit() or len(decimal_part) != 2:
+            return False
+    else:
+        integer_part = amount_str
+    return integer_part.replace(',', '').replace(' ', '').isdigit()
+
+
+def legacy_is_phone(amount_str):
+    """detect_table_rows' phone-number check as it was: 9-12 bare digits"""
+    cleaned = amount_str.replace(',', '').replace('.', '')
+    return 9 <= len(cleaned) <= 12 and '.' not in amount_str and ',' not in amount_str
+
+
+def legacy_classify(token):
+    """Currency check, phone check and value, each parsing the token again"""
+    return legacy_looks_like_currency(token), legacy_is_phone(token), legacy_parse_amount(token)
+
+
+def scanner_classify(token):
+    """The same three answers from parse_pdf.py (for checking; the timed path is one scan_amount_token)"""
+    kind, _ = scan_amount_token(token)
+    return kind == TOKEN_CURRENCY, kind == TOKEN_PHONE, parse_amount(token)
+
+
+def collect_tokens(pdf_path, max_pages=None):
+    """``(line_tokens, cells)``: amount-like tokens of each page's text and every table cell"""
+    amount_re = bank_profile_for(None).amount_re
+    line_tokens = []
+    cells = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages[:max_pages]:
+            line_tokens.extend(amount_re.findall(page.extract_text() or ""))
+            for table in page.extract_tables():
+                cells.extend(str(cell) for row in table for cell in row if cell)
+            page.close()
+    return line_tokens, cells
+
+
+def time_per_token(classify, tokens, repeat):
+    """Best of ``repeat`` runs, in microseconds per token"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for token in tokens:
+            classify(token)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / max(len(tokens), 1) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the amount scanner against the per-check parsing it replaced')
+    parser.add_argument('pdf_paths', nargs='+', help='PDF files to take tokens from')
+    parser.add_argument('--pages', type=int, default=None, help='Only read the first N pages of each file')
+    parser.add_argument('--repeat', type=int, default=5, help='Timing runs per method (best is reported)')
+    args = parser.parse_args()
+
+    line_tokens = []
+    cells = []
+    for pdf_path in args.pdf_paths:
+        pdf_line_tokens, pdf_cells = collect_tokens(pdf_path, args.pages)
+        line_tokens.extend(pdf_line_tokens)
+        cells.extend(pdf_cells)
+    if not line_tokens and not cells:
+        print("Error: no tokens found", file=sys.stderr)
+        sys.exit(1)
+
+    # (corpus, tokens, legacy, scanner to check against it, scanner as timed)
+    corpora = [
+        ('line tokens', line_tokens, legacy_classify, scanner_classify, scan_amount_token),
+        ('table cells', cells, legacy_parse_amount, parse_amount, parse_amount),
+    ]
+    mismatched = 0
+    for name, tokens, legacy, scanner, timed_scanner in corpora:
+        if not tokens:
+            continue
+        mismatches = [token for token in tokens if legacy(token) != scanner(token)]
+        legacy_us = time_per_token(legacy, tokens, args.repeat)
+        scanner_us = time_per_token(timed_scanner, tokens, args.repeat)
+        print(f"{name}: {len(tokens)} ({len(set(tokens))} distinct)")
+        print(f"  legacy checks  {legacy_us:7.2f} us/token")
+        print(f"  scanner        {scanner_us:7.2f} us/token  ({legacy_us / scanner_us:.1f}x)")
+        print(f"  mismatched: {len(mismatches)}")
+        for token in mismatches[:10]:
+            print(f"    {token!r}: legacy {legacy(token)} scanner {scanner(token)}")
+        mismatched += len(mismatches)
+    if mismatched:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Extraction benchmark
+Times per-page text/table extraction with pdfplumber's own extract_text()/extract_tables()
+against the shared char layer used by parse_pdf.py, and checks both give identical output.
+
+Usage: python benchmark_extraction.py <pdf_path> [<pdf_path> ...] [--pages N]
+"""
+
+import argparse
+import sys
+import time
+
+import pdfplumber
+
+from parse_pdf import (
+    FORMAT_PAYBILL,
+    TABLE_STRATEGIES,
+    bank_profile_for,
+    body_region_matches,
+    build_page_layer,
+    find_body_region,
+    fingerprint_pdf,
+    layer_tables,
+    layer_text,
+)
+
+
+def extract_direct(view):
+    """Text plus every table strategy, each call walking the page's chars itself"""
+    text = view.extract_text() or ""
+    tables = [view.extract_tables(strategy['settings'] or None) for strategy in TABLE_STRATEGIES]
+    return text, tables
+
+
+def extract_layered(view):
+    """Text plus every table strategy, all derived from one page layer"""
+    layer = build_page_layer(view)
+    text = layer_text(layer)
+    tables = [layer_tables(layer, strategy['settings'] or None) for strategy in TABLE_STRATEGIES]
+    return text, tables
+
+
+def benchmark_pdf(pdf_path, max_pages=None):
+    """Return (pages, layout_seconds, direct_seconds, layered_seconds, mismatched_pages)"""
+    layout_time = direct_time = layered_time = 0.0
+    mismatches = 0
+    pages = 0
+
+    with pdfplumber.open(pdf_path) as pdf:
+        # Pages are cropped exactly as iter_pdf_pages crops them
+        statement_format, _ = fingerprint_pdf(pdf)
+        crop = statement_format != FORMAT_PAYBILL
+        profile = bank_profile_for(statement_format)
+        region = None
+        for page in pdf.pages[:max_pages]:
+            # Layout (pdfminer parsing into chars/edges) is shared by both paths; time it separately
+            start = time.perf_counter()
+            page.chars
+            page.edges
+            layout_time += time.perf_counter() - start
+
+            view = page
+            if crop and page.page_number > 1:
+                if region is None or not body_region_matches(page, region):
+                    region = find_body_region(page, profile)
+                if region is not None:
+                    view = page.crop(region['bbox'])
+
+            start = time.perf_counter()
+            direct = extract_direct(view)
+            direct_time += time.perf_counter() - start
+
+            start = time.perf_counter()
+            layered = extract_layered(view)
+            layered_time += time.perf_counter() - start
+
+            if direct != layered:
+                mismatches += 1
+            pages += 1
+            page.close()
+
+    return pages, layout_time, direct_time, layered_time, mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark per-page extraction: direct pdfplumber calls vs shared char layer')
+    parser.add_argument('pdf_paths', nargs='+', help='PDF files to benchmark')
+    parser.add_argument('--pages', type=int, default=None, help='Only benchmark the first N pages of each file')
+    args = parser.parse_args()
+
+    print(f"{'pages':>5} {'layout ms/pg':>12} {'direct ms/pg':>12} {'layer ms/pg':>12} {'speedup':>7}  file")
+    total_pages = total_direct = total_layered = 0.0
+    failed = False
+    for pdf_path in args.pdf_paths:
+        pages, layout_time, direct_time, layered_time, mismatches = benchmark_pdf(pdf_path, args.pages)
+        if not pages:
+            continue
+        total_pages += pages
+        total_direct += direct_time
+        total_layered += layered_time
+        print(
+            f"{pages:>5} {layout_time / pages * 1000:>12.1f} {direct_time / pages * 1000:>12.1f} "
+            f"{layered_time / pages * 1000:>12.1f} {direct_time / max(layered_time, 1e-9):>6.2f}x  {pdf_path}"
+        )
+        if mismatches:
+            failed = True
+            print(f"      {mismatches} page(s) extracted differently", file=sys.stderr)
+
+    if total_pages:
+        print(
+            f"total: direct {total_direct / total_pages * 1000:.1f} ms/pg, "
+            f"layer {total_layered / total_pages * 1000:.1f} ms/pg "
+            f"({total_direct / max(total_layered, 1e-9):.2f}x)"
+        )
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
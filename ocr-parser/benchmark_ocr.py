@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+OCR profile benchmark
+OCRs statements with each preprocessing profile in OCR_PROFILES and reports seconds per page
+and row-level accuracy against reference output (a parse_pdf.py --output JSON per statement),
+so the fastest profile that keeps accuracy can be picked.
+
+Usage: python benchmark_ocr.py <pdf_path> [<pdf_path> ...] --reference-dir DIR
+                               [--profiles fast,clean] [--pages N]
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+import pdfplumber
+
+from parse_pdf import (
+    OCR_AVAILABLE,
+    OCR_PROFILES,
+    amount_string,
+    iter_ocr_page_data,
+    parse_pdf_pages,
+    transactions_for_json,
+)
+
+# Fields a transaction must reproduce exactly to count as a matched row. Balance is
+# left out: the OCR table path does not carry it on every row
+ROW_FIELDS = ('tran_date', 'credit', 'debit')
+
+
+def row_key(transaction):
+    # Reference files carry amounts as decimal strings (older ones as floats)
+    return tuple(
+        amount_string(transaction.get(field)) if field in ('credit', 'debit') else transaction.get(field)
+        for field in ROW_FIELDS
+    )
+
+
+def row_accuracy(transactions, reference):
+    """Return (matched, missing, extra) reference rows, matching rows as a multiset"""
+    found = Counter(row_key(t) for t in transactions)
+    expected = Counter(row_key(t) for t in reference)
+    matched = sum((found & expected).values())
+    return matched, sum(expected.values()) - matched, sum(found.values()) - matched
+
+
+def benchmark_profile(pdf_path, profile, page_numbers, reference):
+    """Return (seconds, transactions, matched, missing, extra) for one statement and profile"""
+    start = time.perf_counter()
+    pages = list(iter_ocr_page_data(pdf_path, page_numbers=page_numbers, profile=profile))
+    seconds = time.perf_counter() - start
+    transactions = transactions_for_json(parse_pdf_pages(pages))
+    return (seconds, len(transactions)) + row_accuracy(transactions, reference)
+
+
+def load_reference(reference_dir, pdf_path, page_numbers):
+    path = Path(reference_dir) / (Path(pdf_path).stem + '.json')
+    with open(path) as f:
+        reference = json.load(f)
+    wanted = set(page_numbers)
+    return [t for t in reference if t.get('page_number') in wanted]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark OCR preprocessing profiles for speed and row accuracy')
+    parser.add_argument('pdf_paths', nargs='+', help='PDF files to benchmark')
+    parser.add_argument('--reference-dir', required=True,
+                        help='Directory holding <pdf stem>.json reference transactions for each PDF')
+    parser.add_argument('--profiles', default=','.join(OCR_PROFILES),
+                        help='Comma-separated profiles to compare (default: all)')
+    parser.add_argument('--pages', type=int, default=None, help='Only OCR the first N pages of each file')
+    args = parser.parse_args()
+
+    if not OCR_AVAILABLE:
+        print("Error: pdf2image/pytesseract are not installed", file=sys.stderr)
+        sys.exit(1)
+    profiles = [name.strip() for name in args.profiles.split(',') if name.strip()]
+    unknown = [name for name in profiles if name not in OCR_PROFILES]
+    if unknown:
+        print(f"Error: unknown profile(s): {', '.join(unknown)}", file=sys.stderr)
+        sys.exit(1)
+
+    totals = {name: [0.0, 0, 0, 0, 0] for name in profiles}
+    for pdf_path in args.pdf_paths:
+        with pdfplumber.open(pdf_path) as pdf:
+            page_numbers = list(range(1, len(pdf.pages) + 1))[:args.pages]
+        reference = load_reference(args.reference_dir, pdf_path, page_numbers)
+
+        print(pdf_path)
+        print(f"  {'profile':<10} {'s/page':>7} {'rows':>5} {'matched':>8} {'missing':>8} {'extra':>6} {'accuracy':>8}")
+        for name in profiles:
+            seconds, rows, matched, missing, extra = benchmark_profile(pdf_path, name, page_numbers, reference)
+            accuracy = matched / len(reference) if reference else 1.0
+            print(
+                f"  {name:<10} {seconds / max(len(page_numbers), 1):>7.2f} {rows:>5} {matched:>8} "
+                f"{missing:>8} {extra:>6} {accuracy:>8.1%}"
+            )
+            total = totals[name]
+            total[0] += seconds
+            total[1] += len(page_numbers)
+            total[2] += matched
+            total[3] += len(reference)
+            total[4] += extra
+
+    print("total:")
+    for name, (seconds, pages, matched, expected, extra) in totals.items():
+        accuracy = matched / expected if expected else 1.0
+        print(f"  {name:<10} {seconds / max(pages, 1):>7.2f} s/page  {accuracy:>7.1%} rows matched  {extra} extra")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Parser edge-case checks
+Inputs that once broke parsing, each run through the parser with its expected
+result. Needs no PDFs; exits non-zero if any check fails.
+
+Usage: python check_edge_cases.py
+"""
+
+import sys
+
+import parse_pdf
+from parse_pdf import (
+    NUMPY_AVAILABLE,
+    detect_table_rows,
+    parse_bank_words,
+    parse_date,
+    parse_paybill_table,
+    transactions_for_json,
+)
+
+
+def check_short_year_dates():
+    """Years before 1000 come out zero-padded; years datetime can't hold are rejected"""
+    assert parse_date('12/05/345') == '0345-05-12', parse_date('12/05/345')
+    assert parse_date('12/05/0') is None, parse_date('12/05/0')
+
+
+def check_short_year_text_row():
+    """An OCR-garbled year keeps its row instead of aborting the page"""
+    rows, _ = detect_table_rows("12/05/345 MPS 254700000000 payment from member 1,000.00 5,000.00")
+    rows = transactions_for_json(rows)
+    assert len(rows) == 1, rows
+    assert rows[0]['tran_date'] == '0345-05-12', rows[0]
+    assert rows[0]['credit'] == '1000.00', rows[0]
+
+
+def check_unreadable_date_skips_row():
+    """A date string Transaction can't read (as strftime once produced) skips the row, not the page"""
+    original = parse_pdf.parse_date
+    parse_pdf.parse_date = lambda date_str, formats=None: '345-05-12'
+    try:
+        rows, _ = detect_table_rows("12/05/345 MPS 254700000000 payment from member 1,000.00 5,000.00")
+    finally:
+        parse_pdf.parse_date = original
+    assert rows == [], rows
+
+
+def check_legacy_paybill_rows():
+    """A plain list of paybill rows (header first) keeps the output it always had: one table, index 0"""
+    header = ['Receipt No.', 'Initiation Time', 'Completion Time', 'Details', 'Currency',
+              'Transaction Status', 'Balance', 'Paid In', 'Withdrawn']
+    row = ['TJVMV8W9FC', '31-10-2025 17:18:52', '31-10-2025 17:18:52',
+           'Pay Bill from 25472****176 - JOYCE NJAGI', 'KES', 'Completed', '12001.00', '5000.00', '']
+    rows = transactions_for_json(parse_paybill_table([header, row]))
+    assert len(rows) == 1, rows
+    assert rows[0]['table_index'] == 0, rows[0]
+    assert rows[0]['page_number'] is None, rows[0]
+    assert rows[0]['credit'] == '5000.00', rows[0]
+
+
+# Word boxes ([x0, x1, top, bottom, text]) of the last page of an Equity statement:
+# one credit whose particulars wrap over three lines, then the Grand Total line
+LAST_PAGE_WORDS = [
+    [58.2, 77.8, 145.7, 154.7, 'Tran'], [80.2, 99.8, 145.7, 154.7, 'Date'],
+    [112.4, 136.4, 145.7, 154.7, 'Value'], [138.9, 158.4, 145.7, 154.7, 'Date'],
+    [186.2, 205.7, 145.7, 154.7, 'Tran'], [208.2, 254.7, 145.7, 154.7, 'Particulars'],
+    [282.3, 328.8, 145.7, 154.7, 'Instrument'], [365.1, 387.6, 145.7, 154.7, 'Debit'],
+    [448.4, 474.4, 145.7, 154.7, 'Credit'], [529.0, 563.5, 145.7, 154.7, 'Balance'],
+    [301.5, 309.5, 157.7, 166.7, 'Id'],
+    [53.9, 99.9, 173.7, 182.7, '29-11-2025'], [110.6, 156.6, 173.7, 182.7, '29-11-2025'],
+    [167.3, 182.4, 174.7, 181.7, 'MPS'], [184.4, 231.1, 174.7, 181.7, '254740197787'],
+    [460.4, 500.4, 173.7, 182.7, '13,000.00'], [545.5, 585.5, 173.7, 182.7, '21,966.00'],
+    [167.3, 214.7, 186.7, 193.7, 'TKT8WBCMF2'], [216.7, 255.6, 186.7, 193.7, '0716227320'],
+    [167.3, 193.7, 198.7, 205.7, 'EUNICE'], [195.7, 215.1, 198.7, 205.7, 'NDUT'],
+    [166.9, 193.4, 216.7, 225.7, 'Grand'], [195.9, 217.4, 216.7, 225.7, 'Total'],
+    [375.4, 415.4, 216.7, 225.7, '30,115.00'], [460.4, 500.4, 216.7, 225.7, '34,000.00'],
+    [545.5, 585.5, 216.7, 225.7, '21,966.00'],
+    [36.0, 42.7, 702.0, 714.0, '_'],
+]
+
+
+def check_words_engine_last_page_credit():
+    """The words engine keeps a wrapped credit just above the Grand Total line, exactly once"""
+    if not NUMPY_AVAILABLE:
+        return
+    page_data = {'page_number': 2, 'statement_format': 'equity', 'words': LAST_PAGE_WORDS, 'rules': []}
+    rows, template = parse_bank_words(page_data)
+    assert template is not None, 'no column template'
+    rows = transactions_for_json(rows)
+    assert len(rows) == 1, rows
+    assert rows[0]['credit'] == '13000.00' and rows[0]['debit'] == '0.00', rows[0]
+    assert rows[0]['particulars'] == 'MPS 254740197787 TKT8WBCMF2 0716227320 EUNICE NDUT', rows[0]
+
+
+CHECKS = [
+    check_short_year_dates,
+    check_short_year_text_row,
+    check_unreadable_date_skips_row,
+    check_legacy_paybill_rows,
+    check_words_engine_last_page_credit,
+]
+
+
+def main():
+    failed = 0
+    for check in CHECKS:
+        try:
+            check()
+        except AssertionError as e:
+            failed += 1
+            print(f"FAIL {check.__name__}: {e}")
+        else:
+            print(f"ok   {check.__name__}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
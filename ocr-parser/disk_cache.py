@@ -0,0 +1,153 @@
+"""
+On-disk cache shared by parser runs
+Entries are gzipped JSON files named by a content hash. Writes are atomic and
+eviction tolerates files disappearing underneath it, so several queue workers
+can share one cache directory without locking.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+
+ENTRY_SUFFIX = '.json.gz'
+TEMP_SUFFIX = '.tmp'
+# Temp files older than this were left behind by a killed writer
+STALE_TEMP_SECONDS = 3600
+# Puts between directory scans while this process's size estimate stays under
+# the limit; the scan also picks up what other workers have written
+EVICT_EVERY_PUTS = 64
+# Eviction trims to this share of max_bytes, leaving room for the next puts
+EVICT_TARGET_RATIO = 0.9
+
+
+def hash_file(path, chunk_size=1024 * 1024):
+    """SHA-256 hex digest of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def make_key(*parts):
+    """Combine content hashes and version strings into a single cache key"""
+    return hashlib.sha256('\x1f'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+
+class DiskCache:
+    """Size-bounded key/value store of JSON documents.
+
+    Hits refresh the entry's mtime, and eviction drops the least recently used
+    entries until the directory is back under ``max_bytes`` (with
+    ``EVICT_TARGET_RATIO`` headroom). Eviction walks the whole directory, so
+    puts only run it on the first write, when the running size estimate (the
+    last scan's total plus this process's writes) goes over ``max_bytes``, or
+    every ``EVICT_EVERY_PUTS`` writes.
+    """
+
+    def __init__(self, directory, max_bytes=512 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._estimated_bytes = None
+        self._puts_since_evict = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        # Fan out into sub-directories so a single directory never holds every entry
+        return os.path.join(self.directory, key[:2], key + ENTRY_SUFFIX)
+
+    def get(self, key):
+        """Return the cached value, or None on a miss or unreadable entry"""
+        path = self._path(key)
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                value = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            # Truncated or corrupt entry - drop it and treat as a miss
+            print(f"Warning: discarding unreadable cache entry {path}: {e}", file=sys.stderr)
+            self._remove(path)
+            return None
+
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return value
+
+    def put(self, key, value):
+        """Store a JSON-serialisable value, evicting down to the size limit when it may be exceeded"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            replaced_size = os.stat(path).st_size
+        except FileNotFoundError:
+            replaced_size = 0
+
+        # Write to a private temp file and rename, so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=TEMP_SUFFIX)
+        try:
+            with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb') as f:
+                f.write(json.dumps(value, separators=(',', ':')).encode('utf-8'))
+            os.replace(tmp_path, path)
+        except Exception:
+            self._remove(tmp_path)
+            raise
+
+        self._puts_since_evict += 1
+        if self._estimated_bytes is not None:
+            try:
+                self._estimated_bytes += os.stat(path).st_size - replaced_size
+            except FileNotFoundError:
+                pass
+        if (
+            self._estimated_bytes is None
+            or self._estimated_bytes > self.max_bytes
+            or self._puts_since_evict >= EVICT_EVERY_PUTS
+        ):
+            self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes, with headroom"""
+        entries = []
+        total = 0
+        now = time.time()
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                if name.endswith(TEMP_SUFFIX):
+                    if now - stat.st_mtime > STALE_TEMP_SECONDS:
+                        self._remove(path)
+                    continue
+                if not name.endswith(ENTRY_SUFFIX):
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        if total > self.max_bytes:
+            target = self.max_bytes * EVICT_TARGET_RATIO
+            entries.sort()
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                self._remove(path)
+                total -= size
+
+        self._estimated_bytes = total
+        self._puts_since_evict = 0
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
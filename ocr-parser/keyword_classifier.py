@@ -0,0 +1,92 @@
+"""
+Keyword classifier
+One Aho-Corasick automaton over every keyword of a bank profile, grouped into
+categories (footer, header, summary, balance context...). A line is scanned
+once, character by character, and comes back with the number of distinct
+keywords of each category it contains - the same counts as testing every
+keyword with ``in``, at a cost that grows with the line rather than with the
+line times the number of keywords.
+"""
+
+from collections import deque
+
+
+class KeywordClassifier:
+    """Count distinct keyword hits per category in a single pass over the text.
+
+    Keywords are matched as plain substrings, case-sensitively; callers pass
+    upper-cased text, and profiles upper-case their keywords. The automaton is
+    built as a full transition table (failure links folded in), so scanning
+    costs one dict lookup per character.
+    """
+
+    def __init__(self, categories):
+        keywords = []
+        keyword_ids = {}
+        self.categories = tuple(categories)
+        self._keyword_categories = []
+        for category, words in categories.items():
+            for word in words:
+                if word not in keyword_ids:
+                    keyword_ids[word] = len(keywords)
+                    keywords.append(word)
+                    self._keyword_categories.append([])
+                self._keyword_categories[keyword_ids[word]].append(category)
+        self._zero = dict.fromkeys(self.categories, 0)
+
+        # Trie of every keyword; outputs[state] holds the ids of keywords ending there
+        goto = [{}]
+        outputs = [frozenset()]
+        for keyword_id, word in enumerate(keywords):
+            state = 0
+            for char in word:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    outputs.append(frozenset())
+                state = next_state
+            outputs[state] = outputs[state] | {keyword_id}
+
+        # Breadth-first failure links; each state inherits its failure state's
+        # transitions and outputs, which turns the trie into a DFA
+        fail = [0] * len(goto)
+        transitions = [None] * len(goto)
+        transitions[0] = dict(goto[0])
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                target = goto[fallback].get(char, 0)
+                fail[next_state] = target if target != next_state else 0
+                outputs[next_state] = outputs[next_state] | outputs[fail[next_state]]
+                queue.append(next_state)
+            table = dict(transitions[fail[state]])
+            table.update(goto[state])
+            transitions[state] = table
+
+        self._transitions = transitions
+        self._outputs = [output or None for output in outputs]
+
+    def scan(self, text):
+        """Return ``{category: number of distinct keywords of that category found in text}``"""
+        transitions = self._transitions
+        outputs = self._outputs
+        state = 0
+        found = None
+        for char in text:
+            state = transitions[state].get(char, 0)
+            output = outputs[state]
+            if output is not None:
+                found = output if found is None else found | output
+        counts = self._zero.copy()
+        if found:
+            keyword_categories = self._keyword_categories
+            for keyword_id in found:
+                for category in keyword_categories[keyword_id]:
+                    counts[category] += 1
+        return counts
@@ -4,144 +4,1114 @@ PDF Transaction Parser
 Extracts transactions from bank statements (M-Pesa Paybill and regular statements)
 """
 
+import hashlib
 import json
 import sys
 import argparse
 import re
 import os
+from bisect import bisect_left, bisect_right
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
 
 try:
     import pdfplumber
+    from pdfplumber.utils import DEFAULT_Y_TOLERANCE, cluster_objects, extract_text as extract_chars_text, extract_words
 except ImportError:
     print("Error: pdfplumber not installed. Install with: pip install pdfplumber", file=sys.stderr)
     sys.exit(1)
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
 try:
     from pdf2image import convert_from_path
+    from PIL import Image, ImageOps
     import pytesseract
     OCR_AVAILABLE = True
 except ImportError:
     OCR_AVAILABLE = False
 
+from bank_profiles import DEFAULT_BANK_PROFILE, PROFILE_DIR, load_bank_profiles
+from disk_cache import DiskCache, hash_file, make_key
+from transaction_record import Transaction, format_cents, to_cents
+
 PARSE_DEBUG = os.environ.get("PARSE_DEBUG") == "1"
 
+# Bump whenever page extraction output changes, so cached extractions are not reused
+EXTRACTOR_VERSION = "6"
+
 
 def debug_log(message):
     if PARSE_DEBUG:
         print(message, file=sys.stderr)
 
 
-def extract_text_from_pdf_pdfplumber(pdf_path):
-    """Extract text and tables from PDF using pdfplumber"""
-    pages_content = []
-    try:
-        with pdfplumber.open(pdf_path) as pdf:
-            page_cache = []
-            is_paybill = False
-
-            # First pass: cache text and detect paybill format
-            for page_index, page in enumerate(pdf.pages, start=1):
-                text = page.extract_text() or ""
-                if not is_paybill and "Receipt No" in text and "Paid In" in text and "Completion Time" in text:
-                    is_paybill = True
-                page_cache.append({'index': page_index, 'page': page, 'text': text})
-
-            # Second pass: extract per-page content
-            for cache_entry in page_cache:
-                page_index = cache_entry['index']
-                page = cache_entry['page']
-                text = cache_entry['text']
-
-                page_data = {
+PAYBILL_HEADER_MARKERS = ("Receipt No", "Paid In", "Completion Time")
+
+# Statement formats recognised by fingerprint_statement()
+FORMAT_PAYBILL = 'paybill'
+FORMAT_EQUITY = 'equity'
+FORMAT_UNKNOWN = 'unknown'
+
+# Bank statement layouts (bank_profiles/*.json), compiled once; a bank
+# statement's format is the name of the profile its fingerprints matched
+BANK_PROFILES = load_bank_profiles()
+
+# Table finder settings tried on bank pages, in order. snap/join tolerances are
+# spelled out so a persisted calibration records exactly what worked.
+TABLE_STRATEGIES = [
+    {'name': 'lines', 'settings': {}},
+    {'name': 'lines_strict', 'settings': {
+        'vertical_strategy': 'lines_strict',
+        'horizontal_strategy': 'lines_strict',
+        'snap_tolerance': 3,
+        'join_tolerance': 3,
+    }},
+]
+
+# Bank statement parsing paths picked by choose_bank_path()
+BANK_PATH_TEXT = 'text'
+BANK_PATH_TABLE = 'table'
+BANK_PATH_DUAL = 'dual'
+BANK_PATH_WORDS = 'words'
+
+# Bank statement engines selectable with --bank-engine
+BANK_ENGINE_HEURISTIC = 'heuristic'
+BANK_ENGINE_WORDS = 'words'
+
+# Output formats selectable with --format: one indented JSON array, or one
+# compact JSON transaction per line, streamed per page, then a summary line
+OUTPUT_JSON = 'json'
+OUTPUT_NDJSON = 'ndjson'
+
+# Pages with transactions on which both bank parsers run before committing to one
+PATH_SAMPLE_PAGES = 3
+
+# Words engine (--bank-engine words): how far (pt) a stacked header label may
+# spread around the profile's column header anchors, the share of lines
+# allowed to spill across a column gutter, and the widest space (pt) between
+# two words of one header label ("Tran Date") - never a gutter, however few
+# body lines the page has to bridge it
+COLUMN_HEADER_SPAN = 12
+COLUMN_OVERFLOW_RATIO = 0.05
+COLUMN_LABEL_GAP = 4
+# Horizontal edges at least this share of the page wide count as row rules
+RULE_MIN_WIDTH_RATIO = 0.5
+
+# Body cropping: the slack (pt) kept around the profile's body header and footer anchors
+BODY_CROP_MARGIN = 2
+
+# A bank page with at most this many chars and at least this share of its area
+# covered by images is a scanned page, and is OCR'd on its own
+OCR_MAX_PAGE_CHARS = 50
+OCR_MIN_IMAGE_COVERAGE = 0.3
+
+# Tesseract language and extra config (both part of the OCR cache key)
+OCR_LANG = 'eng'
+OCR_CONFIG = ''
+
+# Preprocessing applied to each rasterized page before tesseract reads it
+# (--ocr-profile). ``threshold`` binarizes a grayscale page at that level,
+# ``deskew`` straightens pages scanned at a slight angle and ``crop`` trims the
+# page to the box around its ink. ``benchmark_ocr.py`` compares profiles.
+OCR_PROFILES = {
+    'default': {'dpi': 200, 'grayscale': False, 'threshold': None, 'deskew': False, 'crop': False},
+    'fast': {'dpi': 150, 'grayscale': True, 'threshold': 160, 'deskew': False, 'crop': True},
+    'clean': {'dpi': 200, 'grayscale': True, 'threshold': 160, 'deskew': True, 'crop': True},
+    'accurate': {'dpi': 300, 'grayscale': True, 'threshold': None, 'deskew': True, 'crop': True},
+}
+OCR_DEFAULT_PROFILE = 'default'
+
+# Pixels at or below this gray level count as ink when cropping and deskewing,
+# and the padding (pt) kept around the ink box
+OCR_INK_LEVEL = 160
+OCR_CROP_MARGIN = 6
+
+# Deskew tries rotations within +/- this many degrees, in these steps, on a
+# page scaled down to this width
+OCR_DESKEW_MAX_ANGLE = 3.0
+OCR_DESKEW_STEP = 0.5
+OCR_DESKEW_WIDTH = 600
+
+# Most pages one OCR worker renders and reads before handing results back
+OCR_CHUNK_PAGES = 4
+
+# Pages parsed between checkpoint writes (--checkpoint-dir)
+CHECKPOINT_EVERY_PAGES = 10
+
+# Layout of the saved parse state; checkpoints written in another layout are not read
+CHECKPOINT_FORMAT = "3"
+
+# Checkpoints not written for this long belong to abandoned jobs and are deleted at startup
+CHECKPOINT_TTL_SECONDS = 7 * 24 * 3600
+
+# Parser modules that, with the bank profile files, decide what a checkpoint holds;
+# changing any of them (a deploy, a parser fix) starts interrupted parses over
+PARSER_SOURCES = ('parse_pdf.py', 'bank_profiles.py', 'keyword_classifier.py', 'transaction_record.py')
+
+# Checkpoint entries holding transaction records (saved as ``Transaction.state()`` lists)
+CHECKPOINT_TRANSACTION_LISTS = (
+    'text_transactions', 'table_transactions', 'word_transactions', 'ocr_transactions', 'paybill_transactions',
+)
+
+# Pages inspected when fingerprinting; the second is only read if the first is inconclusive
+FINGERPRINT_SAMPLE_PAGES = 2
+
+# Pages a bank statement's table strategy is calibrated and checked on
+TABLE_CALIBRATION_PAGES = 3
+
+
+def is_paybill_text(text):
+    """Check whether page text carries the M-Pesa Paybill column header"""
+    return all(marker in text for marker in PAYBILL_HEADER_MARKERS)
+
+
+def bank_profile_for(statement_format):
+    """Compiled bank profile for a statement format, the default profile for unknown ones"""
+    return BANK_PROFILES.get(statement_format) or BANK_PROFILES[DEFAULT_BANK_PROFILE]
+
+
+def fingerprint_statement(metadata, sample_texts):
+    """Classify a statement as paybill, a bank profile's statement (e.g. Equity) or unknown.
+
+    ``metadata`` is the PDF info dict and ``sample_texts`` the text of the
+    first page or two - enough to see the report header and column titles.
+    """
+    meta_text = ' '.join(str(value) for value in (metadata or {}).values())
+    text = '\n'.join(sample_texts)
+
+    if is_paybill_text(text):
+        return FORMAT_PAYBILL
+
+    upper = (meta_text + '\n' + text).upper()
+    if 'M-PESA' in upper and 'PAID IN' in upper:
+        return FORMAT_PAYBILL
+    for profile in BANK_PROFILES.values():
+        if profile.matches(upper):
+            return profile.name
+
+    return FORMAT_UNKNOWN
+
+
+def fingerprint_pdf(pdf):
+    """Fingerprint an open pdfplumber PDF from its metadata and first pages.
+
+    Returns ``(statement_format, sample_texts)`` where ``sample_texts`` maps
+    page number to the text already extracted, so callers don't lay those
+    pages out again.
+    """
+    sample_texts = {}
+    statement_format = FORMAT_UNKNOWN
+    for page in pdf.pages[:FINGERPRINT_SAMPLE_PAGES]:
+        sample_texts[page.page_number] = page.extract_text() or ""
+        statement_format = fingerprint_statement(pdf.metadata, list(sample_texts.values()))
+        if statement_format != FORMAT_UNKNOWN:
+            break
+    debug_log(f"[FORMAT] {statement_format} (sampled pages {sorted(sample_texts)})")
+    return statement_format, sample_texts
+
+
+def fingerprint_pdf_path(pdf_path, cache=None, calibrate=True):
+    """Fingerprint a PDF on disk without keeping its pages around.
+
+    Returns ``(statement_format, table_strategy)``; the table strategy is
+    calibrated on the document's first pages (``calibrate_table_strategy``)
+    when ``calibrate`` is set, and is None otherwise.
+    """
+    with pdfplumber.open(pdf_path) as pdf:
+        statement_format, _ = fingerprint_pdf(pdf)
+        table_strategy = calibrate_table_strategy(pdf, statement_format, cache) if calibrate else None
+    return statement_format, table_strategy
+
+
+def build_page_layer(page, with_words=True):
+    """Materialize a page's chars, words and ruling lines once.
+
+    ``page.extract_text()`` and every ``page.extract_tables()`` call each
+    re-walk the page's chars: text groups all of them into words, and table
+    extraction filters the full char list again for every row it finds.
+    The layer keeps the chars (plus an index sorted by vertical centre for
+    cell lookups) and the words, so text lines (``layer_text``), table cells
+    (``layer_tables``) and the words engine all read the same objects.
+    """
+    chars = page.chars
+    return {
+        'page': page,
+        'chars': chars,
+        'words': extract_words(chars) if with_words else [],
+        'edges': page.edges,
+        'rows_index': None,
+    }
+
+
+def layer_text(layer):
+    """Page text from the shared layer - identical to ``page.extract_text()``"""
+    lines = cluster_objects(layer['words'], itemgetter('top'), DEFAULT_Y_TOLERANCE, preserve_order=True)
+    return "\n".join(" ".join(word['text'] for word in line) for line in lines)
+
+
+def layer_rows_index(layer):
+    """Char positions sorted by vertical centre, built on first use"""
+    if layer['rows_index'] is None:
+        keyed = sorted(
+            ((char['top'] + char['bottom']) / 2, position)
+            for position, char in enumerate(layer['chars'])
+        )
+        layer['rows_index'] = ([mid for mid, _ in keyed], [position for _, position in keyed])
+    return layer['rows_index']
+
+
+def layer_table_cells(layer, table):
+    """Cell text of a found table, matching ``Table.extract()``.
+
+    Rows take their chars from a bisect over the layer's vertical-centre
+    index instead of a scan of every char on the page; chars keep page order
+    so words are built exactly as pdfplumber builds them.
+    """
+    chars = layer['chars']
+    mids, positions = layer_rows_index(layer)
+    cells_text = []
+    for row in table.rows:
+        x0, top, x1, bottom = row.bbox
+        row_positions = sorted(positions[bisect_left(mids, top):bisect_left(mids, bottom)])
+        row_chars = [
+            chars[position] for position in row_positions
+            if x0 <= (chars[position]['x0'] + chars[position]['x1']) / 2 < x1
+        ]
+        values = []
+        for cell in row.cells:
+            if cell is None:
+                values.append(None)
+                continue
+            cell_x0, cell_top, cell_x1, cell_bottom = cell
+            cell_chars = [
+                char for char in row_chars
+                if cell_x0 <= (char['x0'] + char['x1']) / 2 < cell_x1
+                and cell_top <= (char['top'] + char['bottom']) / 2 < cell_bottom
+            ]
+            values.append(extract_chars_text(cell_chars) if cell_chars else "")
+        cells_text.append(values)
+    return cells_text
+
+
+def layer_tables(layer, settings=None):
+    """``page.extract_tables(settings)`` with cells filled from the shared layer"""
+    return [layer_table_cells(layer, table) for table in layer['page'].find_tables(settings)]
+
+
+def find_bank_tables(layer, table_strategy=None):
+    """Extract bank statement tables, trying the calibrated strategy first.
+
+    Falls back to the remaining ``TABLE_STRATEGIES`` in order when the preferred
+    one finds nothing on this page. Returns ``(tables, strategy)`` where
+    ``strategy`` is the one that produced the tables, or None.
+    """
+    candidates = list(TABLE_STRATEGIES)
+    if table_strategy is not None:
+        candidates = [table_strategy] + [c for c in candidates if c['name'] != table_strategy['name']]
+
+    for candidate in candidates:
+        try:
+            tables = layer_tables(layer, candidate['settings'] or None)
+        except Exception:
+            tables = []
+        if tables:
+            return tables, candidate
+    return [], None
+
+
+def table_strategy_named(name):
+    """The ``TABLE_STRATEGIES`` entry called ``name``, None if there is none"""
+    return next((strategy for strategy in TABLE_STRATEGIES if strategy['name'] == name), None)
+
+
+def table_layout_key(pdf, statement_format):
+    """Cache key identifying a bank's page layout (producer, format and page size) and the
+    bank profiles its calibration pages were cropped with"""
+    metadata = pdf.metadata or {}
+    first_page = pdf.pages[0] if pdf.pages else None
+    page_size = (round(first_page.width), round(first_page.height)) if first_page else None
+    return make_key(
+        'table-layout',
+        EXTRACTOR_VERSION,
+        bank_profiles_hash(),
+        statement_format,
+        metadata.get('Creator', ''),
+        metadata.get('Producer', ''),
+        page_size,
+    )
+
+
+def calibrate_table_strategy(pdf, statement_format, cache=None):
+    """Pick a bank statement's table strategy once, from the start of the document.
+
+    ``pdf`` must be the whole document. The first of its first
+    ``TABLE_CALIBRATION_PAGES`` pages on which a strategy finds tables decides
+    (pages cropped to the body as ``iter_pdf_pages`` crops them), so the
+    choice doesn't depend on which pages a worker, a ``--pages`` range or a
+    resumed run happens to see. With a ``cache`` the choice is persisted per
+    bank layout, but only once it has been checked against the default
+    finder: a strategy other than the default is stored only if the default
+    finds no tables, or the same tables, on every sampled page. Returns the
+    strategy dict, or None for paybill statements and documents whose first
+    pages have no tables.
+    """
+    if statement_format == FORMAT_PAYBILL:
+        return None
+
+    layout_key = None
+    if cache is not None:
+        layout_key = table_layout_key(pdf, statement_format)
+        table_strategy = cache.get(layout_key)
+        if table_strategy is not None:
+            debug_log(f"[TABLES] reusing calibrated strategy {table_strategy['name']}")
+            return table_strategy
+
+    profile = bank_profile_for(statement_format)
+    default = TABLE_STRATEGIES[0]
+    table_strategy = None
+    checked = True
+    for page in pdf.pages[:TABLE_CALIBRATION_PAGES]:
+        try:
+            if is_scanned_page(page):
+                continue
+            view = page
+            if page.page_number > 1:
+                body_region = find_body_region(page, profile)
+                if body_region is not None:
+                    view = page.crop(body_region['bbox'])
+            layer = build_page_layer(view, with_words=False)
+            if table_strategy is None:
+                tables, table_strategy = find_bank_tables(layer)
+                if table_strategy is not None:
+                    debug_log(f"[TABLES] calibrated on page {page.page_number}: {table_strategy['name']}")
+            else:
+                default_tables = layer_tables(layer)
+                checked = not default_tables or default_tables == layer_tables(layer, table_strategy['settings'] or None)
+        finally:
+            page.close()
+        if table_strategy is default or not checked:
+            break
+
+    if layout_key is not None and table_strategy is not None and checked:
+        try:
+            cache.put(layout_key, table_strategy)
+        except Exception as e:
+            print(f"Warning: could not persist table calibration: {e}", file=sys.stderr)
+    return table_strategy
+
+
+def extract_page_tables(layer, page_index, is_paybill, table_strategy=None):
+    """Extract the tables of a single page (see ``build_page_layer``), shaped for the paybill or bank parsers.
+
+    Returns ``(page_tables, table_strategy)``; for bank pages the strategy is
+    the one that found the tables so it can be reused for later pages.
+    """
+    page_tables = []
+
+    if is_paybill:
+        tables = layer_tables(layer)
+        for table in tables:
+            if table and len(table) > 0:
+                header_row = table[0] if table else []
+                if any(col and ("Receipt No" in str(col) or "Paid In" in str(col)) for col in header_row):
+                    page_tables.append({
+                        'page_number': page_index,
+                        'header': header_row,
+                        'rows': table[1:] if len(table) > 1 else []
+                    })
+                else:
+                    page_tables.append({
+                        'page_number': page_index,
+                        'header': None,
+                        'rows': [row for row in table if row and len(row) >= 4]
+                    })
+    else:
+        tables, table_strategy = find_bank_tables(layer, table_strategy)
+
+        for table in tables:
+            if table and len(table) > 0:
+                page_tables.append({
                     'page_number': page_index,
-                    'text': text if not is_paybill else "",
-                    'tables': []
-                }
-
-                if is_paybill:
-                    tables = page.extract_tables()
-                    for table in tables:
-                        if table and len(table) > 0:
-                            header_row = table[0] if table else []
-                            if any(col and ("Receipt No" in str(col) or "Paid In" in str(col)) for col in header_row):
-                                page_data['tables'].append({
-                                    'page_number': page_index,
-                                    'header': header_row,
-                                    'rows': table[1:] if len(table) > 1 else []
-                                })
-                            else:
-                                page_data['tables'].append({
-                                    'page_number': page_index,
-                                    'header': None,
-                                    'rows': [row for row in table if row and len(row) >= 4]
-                                })
+                    'header': table[0] if table else None,
+                    'rows': table[1:] if len(table) > 1 else table
+                })
+
+    return page_tables, table_strategy
+
+
+def is_scanned_page(page):
+    """Cheap check for an image-only (or nearly text-free) page that needs OCR"""
+    if len(page.chars) > OCR_MAX_PAGE_CHARS:
+        return False
+    page_area = page.width * page.height
+    if not page_area:
+        return False
+    covered = 0.0
+    for image in page.images:
+        width = min(image['x1'], page.width) - max(image['x0'], 0)
+        height = min(image['bottom'], page.height) - max(image['top'], 0)
+        if width > 0 and height > 0:
+            covered += width * height
+    return covered / page_area >= OCR_MIN_IMAGE_COVERAGE
+
+
+def ocr_scanned_page(pdf_path, page_number, cache=None, profile=None):
+    """OCR result (see ``ocr_page``) of one scanned page, empty when OCR is unavailable or fails"""
+    empty = {'text': "", 'words': [], 'cached': None}
+    if not OCR_AVAILABLE:
+        print(f"Warning: page {page_number} looks scanned but OCR is not installed", file=sys.stderr)
+        return empty
+    try:
+        return ocr_page(pdf_path, page_number, cache, profile)
+    except Exception as e:
+        print(f"Error with OCR on page {page_number}: {e}", file=sys.stderr)
+        return empty
+
+
+def line_signature(page, top):
+    """Characters printed on the line at ``top``, left to right, without spaces"""
+    chars = [c for c in page.chars if abs(c['top'] - top) < 1]
+    return ''.join(c['text'] for c in sorted(chars, key=lambda c: c['x0'])).replace(' ', '')
+
+
+def find_body_region(page, profile):
+    """Locate the transaction table body on a bank page.
+
+    The body starts at the column header row (the line carrying the profile's
+    ``body_header_anchor``, ``Credit`` on Equity statements) and ends above
+    the page footer (``body_footer_anchor``: ``Note: Any omission or
+    errors...``), or at the page bottom when there is no footer. Returns a region dict with the
+    crop ``bbox`` and the header/footer line signatures used to check that a
+    later page has the same layout, or None when the page has no header row.
+    """
+    words = page.extract_words()
+    header_tops = [w['top'] for w in words if w['text'].upper() == profile.body_header_anchor]
+    if not header_tops:
+        return None
+    header_top = min(header_tops)
+    footer_tops = [
+        w['top'] for w in words
+        if w['top'] > header_top and w['text'].upper() == profile.body_footer_anchor
+    ]
+    footer_top = min(footer_tops) if footer_tops else None
+    bottom = footer_top - BODY_CROP_MARGIN if footer_top is not None else page.height
+    return {
+        'bbox': (0, max(0, header_top - BODY_CROP_MARGIN), page.width, bottom),
+        'header_top': header_top,
+        'header': line_signature(page, header_top),
+        'footer_top': footer_top,
+        'footer': line_signature(page, footer_top) if footer_top is not None else None,
+    }
+
+
+def body_region_matches(page, region):
+    """Check that a page has its header and footer exactly where ``region`` expects them"""
+    if line_signature(page, region['header_top']) != region['header']:
+        return False
+    if region['footer_top'] is not None and line_signature(page, region['footer_top']) != region['footer']:
+        return False
+    return True
+
+
+def lines_above(page, top):
+    """Number of text lines the uncropped page text has above ``top``.
+
+    Text-path rows are numbered by their line in the page text, so a page
+    cropped to its body adds this back to keep the numbering of the whole page.
+    """
+    chars = [c for c in page.chars if c['bottom'] <= top]
+    return len(cluster_objects(extract_words(chars), itemgetter('top'), DEFAULT_Y_TOLERANCE)) if chars else 0
+
+
+def extract_page_words(layer):
+    """Word boxes and full-width horizontal rules of a page layer for the words engine.
+
+    Words are compact ``[x0, x1, top, bottom, text]`` lists so they stay cheap
+    to pickle between workers and to cache; rules are the y positions of
+    horizontal edges spanning at least half the page width.
+    """
+    page_width = layer['page'].width
+    words = [
+        [round(w['x0'], 2), round(w['x1'], 2), round(w['top'], 2), round(w['bottom'], 2), w['text']]
+        for w in layer['words']
+    ]
+    rules = sorted({
+        round(edge['top'], 1)
+        for edge in layer['edges']
+        if edge['orientation'] == 'h' and edge['x1'] - edge['x0'] >= page_width * RULE_MIN_WIDTH_RATIO
+    })
+    return words, rules
+
+
+def iter_pdf_pages(pdf_path, page_numbers=None, statement_format=None, cache=None,
+                   extraction_plan=None, ocr_profile=None, table_strategy=None):
+    """Stream text and tables from a PDF one page at a time.
+
+    Each pdfplumber page is laid out once, its text and tables are extracted,
+    and its cached chars/lines are released with ``page.close()`` before the
+    next page is touched, so peak memory does not grow with page count.
+
+    The statement format is fingerprinted up front from the first page or two
+    (see ``fingerprint_pdf``); callers that already know it (e.g. parallel
+    workers) pass ``statement_format`` together with the document's
+    ``table_strategy``. Paybill pages never have their text laid out - only
+    their tables are extracted.
+
+    Bank pages are cropped to the transaction body (``find_body_region``)
+    before text, tables or words are extracted, so the repeated bank header
+    block and footer notice are never laid out as text. The first page (with
+    its customer address block) is left whole; the region is found on the
+    second page and reused while later
+    pages show the same header and footer lines at the same place; a page
+    that doesn't is re-calibrated, and a page without a header row is left
+    uncropped. Cropped pages carry ``line_offset``, the text lines cut off
+    above the body (``lines_above``), so text-path ``row_index`` values stay
+    those of the whole page.
+
+    Bank pages that are image-only or nearly text-free (``is_scanned_page``)
+    are OCR'd on their own instead; they come out with ``'ocr': True``, the
+    OCR text and tesseract's word boxes as ``words``, and no tables.
+    ``ocr_profile`` picks their preprocessing (see ``OCR_PROFILES``).
+
+    Bank tables are found with the document's table strategy, calibrated on
+    its first pages when it is fingerprinted (``calibrate_table_strategy``)
+    unless a resumed run passes the one it calibrated before; it is tried
+    first on every page. With a ``cache`` (a ``DiskCache``) the calibration is
+    persisted per bank layout, so later statements from the same bank skip it
+    entirely; the same cache holds OCR results for scanned pages (see
+    ``ocr_page``).
+
+    ``page_numbers`` restricts extraction to those 1-based pages.
+    ``extraction_plan`` (``{'text': bool, 'tables': bool, 'words': bool}``)
+    is re-read for every page, so a consumer that has settled on one parsing
+    path can switch the other side's extraction off mid-stream. With
+    ``'words'`` set, bank pages also carry ``words`` and ``rules`` (see
+    ``extract_page_words``).
+
+    Yields page dicts: ``{'page_number', 'text', 'tables', 'is_paybill',
+    'statement_format', 'table_strategy'}``, ``table_strategy`` being the
+    name of the document's strategy.
+    """
+    with pdfplumber.open(pdf_path, pages=page_numbers) as pdf:
+        sample_texts = {}
+        calibrate = table_strategy is None and (extraction_plan is None or extraction_plan.get('tables', True))
+        if statement_format is None and page_numbers is not None:
+            # The format markers and the table calibration come from the first pages
+            # of the statement, not the range
+            statement_format, calibrated = fingerprint_pdf_path(pdf_path, cache, calibrate)
+            table_strategy = table_strategy or calibrated
+        elif statement_format is None:
+            statement_format, sample_texts = fingerprint_pdf(pdf)
+            if calibrate:
+                table_strategy = calibrate_table_strategy(pdf, statement_format, cache)
+        is_paybill = statement_format == FORMAT_PAYBILL
+        strategy_name = table_strategy['name'] if table_strategy else None
+
+        body_region = None
+
+        for page in pdf.pages:
+            page_index = page.page_number
+            want_text = extraction_plan is None or extraction_plan.get('text', True)
+            want_tables = extraction_plan is None or extraction_plan.get('tables', True)
+            want_words = extraction_plan is not None and extraction_plan.get('words', False)
+            words = rules = None
+            scanned = False
+            line_offset = 0
+            try:
+                scanned = not is_paybill and is_scanned_page(page)
+                if scanned:
+                    # No text layer to lay out; the page is OCR'd once it is closed
+                    text, tables = None, []
                 else:
-                    tables = []
-                    try:
-                        tables = page.extract_tables()
-                    except Exception:
+                    view = page
+                    if not is_paybill and page_index > 1:
+                        if body_region is None or not body_region_matches(page, body_region):
+                            body_region = find_body_region(page, bank_profile_for(statement_format))
+                            if body_region is not None:
+                                debug_log(f"[CROP] body region from page {page_index}: {body_region['bbox']}")
+                        if body_region is not None:
+                            view = page.crop(body_region['bbox'])
+                            line_offset = lines_above(page, body_region['bbox'][1])
+
+                    # Paybill pages only need table cells, never the page's words
+                    layer = build_page_layer(view, with_words=not is_paybill)
+                    if is_paybill or not want_text:
+                        text = ""
+                    elif page_index in sample_texts and view is page:
+                        text = sample_texts[page_index]
+                    else:
+                        text = layer_text(layer)
+                    if is_paybill or want_tables:
+                        tables, _ = extract_page_tables(layer, page_index, is_paybill, table_strategy)
+                    else:
                         tables = []
+                    if want_words and not is_paybill:
+                        words, rules = extract_page_words(layer)
+            finally:
+                page.close()
+
+            if scanned:
+                debug_log(f"[OCR] page {page_index} is scanned, running OCR on it")
+                ocr_result = ocr_scanned_page(pdf_path, page_index, cache, ocr_profile)
+                text, words, rules = ocr_result['text'], ocr_result['words'], []
+
+            page_data = {
+                'page_number': page_index,
+                'text': text,
+                'tables': tables,
+                'is_paybill': is_paybill,
+                'statement_format': statement_format,
+                'table_strategy': strategy_name,
+            }
+            if scanned:
+                page_data['ocr'] = True
+                page_data['ocr_cached'] = ocr_result['cached']
+            if line_offset:
+                page_data['line_offset'] = line_offset
+            if words is not None:
+                page_data['words'] = words
+                page_data['rules'] = rules
+            yield page_data
+
+
+def _parse_page_range(job):
+    """Worker entry point: extract and speculatively parse a contiguous page range.
+
+    Bank pages are parsed with a balance chain that starts from ``None`` at the
+    first page of the range; ``parse_pdf_pages`` re-runs any page whose assumed
+    ``initial_balance`` turns out to differ from the real carried balance.
+    Pages extracted for the words engine are returned as-is; it has no
+    balance chain to speculate on.
+    """
+    pdf_path, page_numbers, statement_format, table_strategy, cache, extraction_plan, ocr_profile = job
+    results = []
+    last_balance = None
+    date_format = None
+    use_date_format(None)
+    pages = iter_pdf_pages(
+        pdf_path,
+        page_numbers=page_numbers,
+        statement_format=statement_format,
+        cache=cache,
+        extraction_plan=extraction_plan,
+        ocr_profile=ocr_profile,
+        table_strategy=table_strategy,
+    )
+    for page_data in pages:
+        if not page_data['is_paybill'] and 'words' not in page_data and not page_data.get('ocr'):
+            if date_format is None:
+                date_format = infer_page_date_format(page_data)
+            page_data['initial_balance'] = last_balance
+            text_transactions, table_transactions, last_balance = parse_bank_page(
+                page_data,
+                initial_balance=last_balance,
+            )
+            page_data['text_transactions'] = text_transactions
+            page_data['table_transactions'] = table_transactions
+            page_data['last_balance'] = last_balance
+        results.append(page_data)
+    return results
+
+
+def iter_pdf_pages_parallel(pdf_path, workers, cache=None, extraction_plan=None, page_numbers=None,
+                            ocr_profile=None, table_strategy=None):
+    """Extract (and pre-parse) pages in a process pool, yielding them in page order.
+
+    Each worker opens the PDF itself and handles a contiguous range of pages, so
+    no pdfplumber objects cross process boundaries. The statement is
+    fingerprinted and its table strategy calibrated here, once, and both are
+    handed to every worker, so output matches ``iter_pdf_pages`` page for
+    page. ``extraction_plan`` is handed to every worker as it stands when the
+    pool starts; ``page_numbers`` restricts the work to those 1-based pages;
+    ``table_strategy`` (from a resumed run) skips the calibration.
+    """
+    if page_numbers is None:
+        with pdfplumber.open(pdf_path) as pdf:
+            page_numbers = list(range(1, len(pdf.pages) + 1))
+    page_count = len(page_numbers)
 
-                    if not tables:
-                        try:
-                            tables = page.extract_tables({
-                                'vertical_strategy': 'lines_strict',
-                                'horizontal_strategy': 'lines_strict',
-                            })
-                        except Exception:
-                            tables = []
-
-                    for table in tables:
-                        if table and len(table) > 0:
-                            page_data['tables'].append({
-                                'page_number': page_index,
-                                'header': table[0] if table else None,
-                                'rows': table[1:] if len(table) > 1 else table
-                            })
-
-                pages_content.append(page_data)
+    if workers <= 1 or page_count < 2:
+        yield from iter_pdf_pages(pdf_path, page_numbers=page_numbers, cache=cache,
+                                  extraction_plan=extraction_plan, ocr_profile=ocr_profile,
+                                  table_strategy=table_strategy)
+        return
+
+    calibrate = table_strategy is None and (extraction_plan is None or extraction_plan.get('tables', True))
+    statement_format, calibrated = fingerprint_pdf_path(pdf_path, cache, calibrate)
+    table_strategy = table_strategy or calibrated
+
+    # A couple of ranges per worker keeps cores busy when page cost is uneven
+    chunk_count = min(page_count, workers * 2)
+    chunk_size = -(-page_count // chunk_count)
+    jobs = [
+        (pdf_path, page_numbers[start:start + chunk_size], statement_format, table_strategy, cache,
+         extraction_plan, ocr_profile)
+        for start in range(0, page_count, chunk_size)
+    ]
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+        for chunk in executor.map(_parse_page_range, jobs):
+            yield from chunk
 
+
+def extract_text_from_pdf_pdfplumber(pdf_path):
+    """Extract text and tables from PDF using pdfplumber"""
+    pages_content = []
+    is_paybill = False
+    statement_format = FORMAT_UNKNOWN
+    try:
+        for page_data in iter_pdf_pages(pdf_path):
+            is_paybill = page_data.pop('is_paybill')
+            statement_format = page_data.pop('statement_format')
+            pages_content.append(page_data)
     except Exception as e:
         print(f"Error extracting with pdfplumber: {e}", file=sys.stderr)
         return None
-    
+
     return {
         'pages': pages_content,
-        'is_paybill': is_paybill
+        'is_paybill': is_paybill,
+        'statement_format': statement_format
     }
 
 
-def extract_text_from_pdf_ocr(pdf_path):
-    """Fallback: Extract text using OCR"""
-    if not OCR_AVAILABLE:
+def extraction_cache_key(pdf_path, layers=('text', 'tables'), ocr_profile=None):
+    """Cache key for a PDF's extracted pages: file hash, extractor version, bank profiles
+    (which fingerprint the statement and place its body crop), extracted layers and the
+    OCR profile its scanned pages were read with"""
+    return make_key(
+        'pdfplumber-pages', EXTRACTOR_VERSION, pdfplumber.__version__, hash_file(pdf_path),
+        bank_profiles_hash(), ocr_profile or OCR_DEFAULT_PROFILE, *layers,
+    )
+
+
+def load_cached_pages(cache, key):
+    """Replay cached page extraction in the same shape ``iter_pdf_pages`` yields"""
+    cached = cache.get(key)
+    if cached is None:
         return None
-    
+    is_paybill = cached.get('is_paybill', False)
+    statement_format = cached.get('statement_format', FORMAT_UNKNOWN)
+    return [
+        dict(page_data, is_paybill=is_paybill, statement_format=statement_format)
+        for page_data in cached.get('pages', [])
+    ]
+
+
+def record_extracted_pages(pages, cache, key):
+    """Pass pages through unchanged, storing their text/tables once the document completes"""
+    recorded = []
+    is_paybill = False
+    statement_format = FORMAT_UNKNOWN
+    for page_data in pages:
+        is_paybill = page_data.get('is_paybill', False)
+        statement_format = page_data.get('statement_format', statement_format)
+        entry = {
+            'page_number': page_data.get('page_number'),
+            'text': page_data.get('text'),
+            'tables': page_data.get('tables', []),
+        }
+        if page_data.get('ocr'):
+            entry['ocr'] = True
+        if page_data.get('line_offset'):
+            entry['line_offset'] = page_data['line_offset']
+        if 'words' in page_data:
+            entry['words'] = page_data['words']
+            entry['rules'] = page_data.get('rules', [])
+        recorded.append(entry)
+        yield page_data
+
     try:
-        images = convert_from_path(pdf_path)
-        text_content = []
-        
-        for image in images:
-            text = pytesseract.image_to_string(image)
-            text_content.append(text)
-        
-        return '\n'.join(text_content)
+        cache.put(key, {'pages': recorded, 'is_paybill': is_paybill, 'statement_format': statement_format})
     except Exception as e:
-        print(f"Error with OCR: {e}", file=sys.stderr)
-        return None
+        print(f"Warning: could not write extraction cache: {e}", file=sys.stderr)
+
+
+def tesseract_words(data, scale, offset=(0, 0)):
+    """Turn ``pytesseract.image_to_data`` output into text lines and word boxes.
+
+    Word boxes use the words engine's ``[x0, x1, top, bottom, text]`` shape,
+    shifted by ``offset`` (the pixel origin of a cropped image within its page)
+    and scaled from image pixels to PDF points by ``scale``. Lines follow
+    tesseract's own block/paragraph/line numbering.
+    """
+    lines = {}
+    words = []
+    for i, text in enumerate(data['text']):
+        text = (text or '').strip()
+        if not text or float(data['conf'][i]) < 0:
+            continue
+        left, top = data['left'][i] + offset[0], data['top'][i] + offset[1]
+        words.append([
+            round(left * scale, 2),
+            round((left + data['width'][i]) * scale, 2),
+            round(top * scale, 2),
+            round((top + data['height'][i]) * scale, 2),
+            text,
+        ])
+        line_key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+        lines.setdefault(line_key, []).append(text)
+    return [' '.join(line) for line in lines.values()], words
+
+
+_tesseract_version = None
+
+
+def tesseract_version():
+    """Installed tesseract version (asked once per process; it spawns tesseract)"""
+    global _tesseract_version
+    if _tesseract_version is None:
+        _tesseract_version = str(pytesseract.get_tesseract_version())
+    return _tesseract_version
 
 
-def parse_paybill_table(tables_data):
+def ocr_cache_key(image, profile):
+    """Cache key for one rendered page: its pixels plus everything that shapes tesseract's output"""
+    digest = hashlib.sha256()
+    digest.update(f"{image.mode}:{image.size}".encode('utf-8'))
+    digest.update(image.tobytes())
+    return make_key(
+        'ocr', digest.hexdigest(), tesseract_version(), OCR_LANG, OCR_CONFIG,
+        json.dumps(profile, sort_keys=True),
+    )
+
+
+def ink_mask(image):
+    """1-bit image of the ink (dark pixels) on a page, set where the page is dark"""
+    return image.convert('L').point(lambda level: 255 if level <= OCR_INK_LEVEL else 0, mode='1')
+
+
+def deskew_angle(image):
+    """Rotation (degrees) that best straightens the text lines of a page.
+
+    Each candidate angle is scored by how sharply ink concentrates into rows:
+    text lines are crispest, and the row-sum profile most uneven, when the
+    page is level. Runs on a downscaled ink mask so it costs a few milliseconds.
+    """
+    mask = ink_mask(image)
+    if mask.width > OCR_DESKEW_WIDTH:
+        mask = mask.resize((OCR_DESKEW_WIDTH, max(1, round(mask.height * OCR_DESKEW_WIDTH / mask.width))))
+    best_angle, best_score = 0.0, None
+    steps = int(round(OCR_DESKEW_MAX_ANGLE / OCR_DESKEW_STEP))
+    for step in range(-steps, steps + 1):
+        angle = step * OCR_DESKEW_STEP
+        rotated = mask.rotate(angle, resample=Image.NEAREST) if angle else mask
+        profile = np.asarray(rotated, dtype=np.float64).sum(axis=1)
+        score = float(np.square(np.diff(profile)).sum())
+        if best_score is None or score > best_score:
+            best_angle, best_score = angle, score
+    return best_angle
+
+
+def preprocess_page_image(image, profile):
+    """Apply an OCR profile's preprocessing to a rasterized page.
+
+    Returns ``(image, offset)``, where ``offset`` is the pixel origin of the
+    (possibly cropped) result within the page, for mapping word boxes back.
+    Deskewing needs numpy and is skipped without it.
+    """
+    if profile['grayscale'] and image.mode != 'L':
+        image = image.convert('L')
+    if profile['deskew'] and NUMPY_AVAILABLE:
+        angle = deskew_angle(image)
+        if angle:
+            debug_log(f"[OCR] deskew {angle:+.1f} deg")
+            fill = 255 if image.mode == 'L' else (255,) * len(image.getbands())
+            image = image.rotate(angle, resample=Image.BICUBIC, fillcolor=fill)
+    offset = (0, 0)
+    if profile['crop']:
+        bbox = ink_mask(image).getbbox()
+        if bbox:
+            margin = round(OCR_CROP_MARGIN * profile['dpi'] / 72.0)
+            bbox = (
+                max(0, bbox[0] - margin), max(0, bbox[1] - margin),
+                min(image.width, bbox[2] + margin), min(image.height, bbox[3] + margin),
+            )
+            image = image.crop(bbox)
+            offset = bbox[:2]
+    if profile['threshold'] is not None:
+        threshold = profile['threshold']
+        image = ImageOps.grayscale(image) if image.mode != 'L' else image
+        image = image.point(lambda level: 255 if level > threshold else 0)
+    return image, offset
+
+
+def ocr_page(pdf_path, page_number, cache=None, profile=None):
+    """Rasterize a single page, preprocess it and OCR it.
+
+    ``profile`` names an entry of ``OCR_PROFILES`` (default
+    ``OCR_DEFAULT_PROFILE``) and sets the DPI and preprocessing. Tesseract runs
+    once in TSV mode; the plain text is rebuilt from its word boxes. Only this
+    page's image is ever in memory. With a ``cache`` (a ``DiskCache``) results
+    are stored under a hash of the rendered image and the profile, so
+    re-parsing a scanned statement - or a re-upload of the same scan - only
+    pays for rasterization. Returns ``{'text', 'words', 'cached'}``, where
+    ``cached`` is True/False for a cache hit/miss and None without a cache.
+    """
+    settings = OCR_PROFILES[profile or OCR_DEFAULT_PROFILE]
+    images = convert_from_path(
+        pdf_path, dpi=settings['dpi'], grayscale=settings['grayscale'],
+        first_page=page_number, last_page=page_number,
+    )
+    try:
+        lines = []
+        words = []
+        cached = None
+        for image in images:
+            key = ocr_cache_key(image, settings) if cache is not None else None
+            result = cache.get(key) if key is not None else None
+            if result is None:
+                prepared, offset = preprocess_page_image(image, settings)
+                data = pytesseract.image_to_data(
+                    prepared, lang=OCR_LANG, config=OCR_CONFIG, output_type=pytesseract.Output.DICT,
+                )
+                if prepared is not image:
+                    prepared.close()
+                image_lines, image_words = tesseract_words(data, 72.0 / settings['dpi'], offset)
+                result = {'lines': image_lines, 'words': image_words}
+                if key is not None:
+                    cached = False
+                    try:
+                        cache.put(key, result)
+                    except Exception as e:
+                        print(f"Warning: could not write OCR cache: {e}", file=sys.stderr)
+            elif cached is None:
+                cached = True
+            lines.extend(result['lines'])
+            words.extend(result['words'])
+        return {'text': '\n'.join(lines), 'words': words, 'cached': cached}
+    finally:
+        for image in images:
+            image.close()
+
+
+def _ocr_page_range(job):
+    """Worker entry point: OCR a contiguous run of pages one page at a time"""
+    pdf_path, page_numbers, cache, profile = job
+    return [(page_number, ocr_page(pdf_path, page_number, cache, profile)) for page_number in page_numbers]
+
+
+def iter_ocr_pages(pdf_path, workers=1, page_numbers=None, cache=None, profile=None):
+    """Yield ``(page_number, result)`` for each page OCR'd (see ``ocr_page``), in page order.
+
+    Pages are rendered one at a time with ``first_page``/``last_page`` instead
+    of rasterizing the whole document up front. With ``workers > 1`` runs of
+    pages are OCR'd by a process pool; each worker renders its own pages, so
+    at most ``workers`` page images exist at once and none cross a process
+    boundary.
+    """
+    if page_numbers is None:
+        with pdfplumber.open(pdf_path) as pdf:
+            page_numbers = list(range(1, len(pdf.pages) + 1))
+
+    if workers <= 1 or len(page_numbers) < 2:
+        for page_number in page_numbers:
+            yield page_number, ocr_page(pdf_path, page_number, cache, profile)
+        return
+
+    # Short runs keep the pool balanced (tesseract time varies a lot per page)
+    # while still yielding in order without holding many finished pages back
+    chunk_size = max(1, min(OCR_CHUNK_PAGES, -(-len(page_numbers) // workers)))
+    jobs = [
+        (pdf_path, page_numbers[start:start + chunk_size], cache, profile)
+        for start in range(0, len(page_numbers), chunk_size)
+    ]
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+        for chunk in executor.map(_ocr_page_range, jobs):
+            yield from chunk
+
+
+def iter_ocr_page_data(pdf_path, workers=1, page_numbers=None, cache=None, profile=None):
+    """OCR every page into page dicts shaped like ``iter_pdf_pages`` output (with ``'ocr': True``)"""
+    for page_number, result in iter_ocr_pages(pdf_path, workers, page_numbers, cache, profile):
+        yield {
+            'page_number': page_number,
+            'text': result['text'],
+            'tables': [],
+            'is_paybill': False,
+            'statement_format': FORMAT_UNKNOWN,
+            'table_strategy': None,
+            'ocr': True,
+            'ocr_cached': result['cached'],
+            'words': result['words'],
+            'rules': [],
+        }
+
+
+@lru_cache(maxsize=32)
+def paybill_row_extractor(receipt_no_col, completion_time_col, details_col, paid_in_col):
+    """Row extractor for one paybill header layout, built once per set of column indices.
+
+    ``extract(row)`` returns the stripped ``(receipt_no, completion_time, details)`` cells, or None
+    when the row is too short for the layout or one of those cells is empty - only those rows need
+    parse_paybill_table's fallback scan. Layouts missing one of the columns reject every row.
+    """
+    columns = (receipt_no_col, completion_time_col, details_col)
+    if None in columns or paid_in_col is None:
+        return lambda row: None
+    min_length = max(columns + (paid_in_col,)) + 1
+    get_cells = itemgetter(*columns)
+
+    def extract(row):
+        if len(row) < min_length:
+            return None
+        receipt_no, completion_time, details = get_cells(row)
+        if not (receipt_no and completion_time and details):
+            return None
+        cells = (str(receipt_no).strip(), str(completion_time).strip(), str(details).strip())
+        return cells if all(cells) else None
+
+    return extract
+
+
+def paybill_fallback_rate(stats):
+    """Share of paybill data rows the row extractor rejected and the fallback scan had to read"""
+    return stats.get('paybill_fallback_rows', 0) / max(stats.get('paybill_rows', 0), 1)
+
+
+def paybill_columns(header_row):
+    """Column indices of a paybill header row, by role (None for a column the header lacks)"""
+    columns = dict.fromkeys(('paid_in', 'completion_time', 'details', 'receipt_no', 'balance', 'withdrawn'))
+    for i, cell in enumerate(header_row or []):
+        cell_str = str(cell).strip().upper() if cell else ""
+        if "PAID IN" in cell_str or "PAIDIN" in cell_str:
+            columns['paid_in'] = i
+        elif "BALANCE" in cell_str:
+            columns['balance'] = i  # Track balance column to exclude it
+        elif "WITHDRAWN" in cell_str:
+            columns['withdrawn'] = i  # Track withdrawn column to exclude it
+        elif "COMPLETION" in cell_str or "COMPLETION TIME" in cell_str:
+            columns['completion_time'] = i
+        elif "DETAILS" in cell_str:
+            columns['details'] = i
+        elif "RECEIPT" in cell_str and "NO" in cell_str:
+            columns['receipt_no'] = i
+    return columns
+
+
+def parse_paybill_table(tables_data, stats=None):
     """Parse M-Pesa Paybill table rows
     Columns: Receipt No, Initiation Time (ignore), Completion Time, Details, Currency (ignore), 
     Transaction Status (ignore), Balance (ignore), Paid In, Withdrawn (ignore), Trade Order Id (ignore)
+
+    Rows go through a cell extractor built for the header's column layout; only rows it rejects
+    are scanned cell by cell, and ``stats`` (when given) records how many.
     """
-    transactions = []
     header_row = None
     rows = []
-    row_page_numbers = []
-    row_table_indices = []
+    # First row of each table in ``rows``, with the table's page number and index
+    table_starts = []
+    table_pages = []
 
     # Handle both old format (list of rows) and new format (list of dicts with header/rows/page)
     if tables_data and isinstance(tables_data[0], dict):
@@ -150,43 +1120,22 @@ def parse_paybill_table(tables_data):
             if header_candidate and not header_row:
                 header_row = header_candidate
 
-            table_rows = table_data.get('rows', []) or []
-            rows.extend(table_rows)
-
-            page_number = table_data.get('page_number')
-            row_page_numbers.extend([page_number] * len(table_rows))
-            row_table_indices.extend([table_index] * len(table_rows))
+            table_starts.append(len(rows))
+            table_pages.append((table_data.get('page_number'), table_index))
+            rows.extend(table_data.get('rows', []) or [])
     else:
+        # A plain list of rows is one table: its rows have no page number and
+        # table_index 0, as they always have
         rows = tables_data or []
-        row_page_numbers = [None] * len(rows)
-        row_table_indices = [0] * len(rows)
+        table_starts = [0]
+        table_pages = [(None, 0)]
         header_row = None
     
     # Identify column indices from header row
-    paid_in_col = None
-    completion_time_col = None
-    details_col = None
-    receipt_no_col = None
-    balance_col = None
-    withdrawn_col = None
-    
-    if header_row:
-        for i, cell in enumerate(header_row):
-            cell_str = str(cell).strip().upper() if cell else ""
-            if "PAID IN" in cell_str or "PAIDIN" in cell_str:
-                paid_in_col = i
-            elif "BALANCE" in cell_str:
-                balance_col = i  # Track balance column to exclude it
-            elif "WITHDRAWN" in cell_str:
-                withdrawn_col = i  # Track withdrawn column to exclude it
-            elif "COMPLETION" in cell_str or "COMPLETION TIME" in cell_str:
-                completion_time_col = i
-            elif "DETAILS" in cell_str:
-                details_col = i
-            elif "RECEIPT" in cell_str and "NO" in cell_str:
-                receipt_no_col = i
+    columns = paybill_columns(header_row)
     
     # If no header found, try to find it in first few rows
+    header_in_rows = False
     if not header_row:
         for row in rows[:5]:
             if not row:
@@ -195,99 +1144,140 @@ def parse_paybill_table(tables_data):
                 cell_str = str(cell).strip().upper() if cell else ""
                 if "PAID IN" in cell_str or "PAIDIN" in cell_str:
                     header_row = row
-                    paid_in_col = i
+                    columns['paid_in'] = i
                     break
                 elif "BALANCE" in cell_str:
-                    balance_col = i
+                    columns['balance'] = i
             if header_row:
+                header_in_rows = True
                 break
-    
-    # Process data rows - skip header row if found
-    start_idx = 1 if header_row and header_row in rows else 0
-    for row_offset, row in enumerate(rows[start_idx:], start=0):
+
+    # Process data rows - skip the first row when the header was found among them
+    # (a table's own header is never one of its rows)
+    start_idx = 1 if header_in_rows else 0
+    return parse_paybill_rows(
+        rows[start_idx:],
+        columns,
+        lambda row_offset: table_pages[bisect_right(table_starts, start_idx + row_offset) - 1],
+        stats=stats,
+    )
+
+
+def parse_paybill_rows(data_rows, columns, row_location, first_row_index=0, stats=None):
+    """Transactions of paybill data rows read with a header's ``paybill_columns``.
+
+    ``row_location(row_offset)`` gives the ``(page_number, table_index)`` of
+    ``data_rows[row_offset]``, whose ``row_index`` is ``first_row_index +
+    row_offset``. ``stats`` (when given) accumulates the row and fallback counts.
+    """
+    transactions = []
+    paid_in_col = columns['paid_in']
+    completion_time_col = columns['completion_time']
+    details_col = columns['details']
+    receipt_no_col = columns['receipt_no']
+    balance_col = columns['balance']
+    withdrawn_col = columns['withdrawn']
+
+    # Without a Paid In column we CANNOT guess the amounts - every row is skipped
+    # This prevents picking up Balance or other columns
+    if paid_in_col is None:
+        return transactions
+
+    # Parse the amount and date columns as whole columns up front; the row
+    # loop below only indexes into the results
+    def column_cells(col):
+        if col is None:
+            return [None] * len(data_rows)
+        return [row[col] if row and col < len(row) else None for row in data_rows]
+
+    paid_in_values = amount_column_values(column_cells(paid_in_col))
+    withdrawn_values = amount_column_values(column_cells(withdrawn_col))
+    completion_dates = date_column_values(column_cells(completion_time_col))
+
+    extract_row = paybill_row_extractor(receipt_no_col, completion_time_col, details_col, paid_in_col)
+    # Columns the fallback scan never takes a field from
+    amount_cols = (paid_in_col, balance_col, withdrawn_col)
+    fallback_rows = 0
+
+    for row_offset, row in enumerate(data_rows):
         if not row or len(row) < 4:
             continue
         
         try:
-            receipt_no = ""
-            completion_time = ""
-            details = ""
-            paid_in = ""
-            
-            # Use column indices if available - STRICTLY use only Paid In column
-            if paid_in_col is not None and paid_in_col < len(row):
-                paid_in_str = str(row[paid_in_col]).strip() if row[paid_in_col] else ""
-                if paid_in_str and parse_amount(paid_in_str):
-                    paid_in = paid_in_str
+            cells = extract_row(row)
+            if cells is not None:
+                receipt_no, completion_time, details = cells
+                completion_from_column = True
             else:
-                # If we don't have Paid In column index, we CANNOT guess - skip this row
-                # This prevents picking up Balance or other columns
-                continue
-            
-            if completion_time_col is not None and completion_time_col < len(row):
-                completion_time = str(row[completion_time_col]).strip() if row[completion_time_col] else ""
-            
-            if details_col is not None and details_col < len(row):
-                details = str(row[details_col]).strip() if row[details_col] else ""
-            
-            if receipt_no_col is not None and receipt_no_col < len(row):
-                receipt_no = str(row[receipt_no_col]).strip() if row[receipt_no_col] else ""
-            
-            # Extract Withdrawn (debit) amount
-            withdrawn = ""
-            if withdrawn_col is not None and withdrawn_col < len(row):
-                withdrawn = str(row[withdrawn_col]).strip() if row[withdrawn_col] else ""
-            
-            # NO FALLBACK - if we don't have column indices, we skip the row
-            # This ensures we only extract from the correct "Paid In" column
-            
-            # Fallback for other fields if column indices not available (but we already have paid_in)
-            if not completion_time:
-                for i, cell in enumerate(row):
-                    if i == paid_in_col or i == balance_col or i == withdrawn_col:
-                        continue
-                    cell_str = str(cell).strip() if cell else ""
-                    if re.search(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}', cell_str):
-                        completion_time = cell_str
-                        break
-            
-            if not details:
-                for i, cell in enumerate(row):
-                    if i == paid_in_col or i == balance_col or i == withdrawn_col:
-                        continue
-                    cell_str = str(cell).strip() if cell else ""
-                    if "Pay Bill" in cell_str or "Paybill" in cell_str or (len(cell_str) > 20 and not re.match(r'^[\d,.\s]+$', cell_str.replace(',', '').replace('.', '').replace(' ', ''))):
-                        details = cell_str
-                        break
-            
-            if not receipt_no:
-                for i, cell in enumerate(row):
-                    if i == paid_in_col or i == balance_col or i == withdrawn_col:
-                        continue
-                    cell_str = str(cell).strip() if cell else ""
-                    if cell_str and len(cell_str) > 5 and not re.search(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}', cell_str) and not parse_amount(cell_str):
-                        receipt_no = cell_str
-                        break
+                # STRICTLY use only the Paid In column for amounts - a row without it is skipped
+                if paid_in_col >= len(row):
+                    continue
+                fallback_rows += 1
+
+                receipt_no = ""
+                completion_time = ""
+                details = ""
+
+                if completion_time_col is not None and completion_time_col < len(row):
+                    completion_time = str(row[completion_time_col]).strip() if row[completion_time_col] else ""
+                completion_from_column = bool(completion_time)
+
+                if details_col is not None and details_col < len(row):
+                    details = str(row[details_col]).strip() if row[details_col] else ""
+
+                if receipt_no_col is not None and receipt_no_col < len(row):
+                    receipt_no = str(row[receipt_no_col]).strip() if row[receipt_no_col] else ""
+
+                # Fallback for fields whose column is missing or empty (amounts never fall back)
+                if not completion_time:
+                    for i, cell in enumerate(row):
+                        if i in amount_cols:
+                            continue
+                        cell_str = str(cell).strip() if cell else ""
+                        if DATE_IN_TOKEN_RE.search(cell_str):
+                            completion_time = cell_str
+                            break
+
+                if not details:
+                    for i, cell in enumerate(row):
+                        if i in amount_cols:
+                            continue
+                        cell_str = str(cell).strip() if cell else ""
+                        if "Pay Bill" in cell_str or "Paybill" in cell_str or (len(cell_str) > 20 and not re.match(r'^[\d,.\s]+$', cell_str.replace(',', '').replace('.', '').replace(' ', ''))):
+                            details = cell_str
+                            break
+
+                if not receipt_no:
+                    for i, cell in enumerate(row):
+                        if i in amount_cols:
+                            continue
+                        cell_str = str(cell).strip() if cell else ""
+                        if cell_str and len(cell_str) > 5 and not DATE_IN_TOKEN_RE.search(cell_str) and not parse_amount(cell_str):
+                            receipt_no = cell_str
+                            break
             
-            # Skip header rows
-            if "Receipt No" in receipt_no or "Completion Time" in completion_time or "Paid In" in paid_in:
+            # Skip header rows (a header's Paid In label never parses as an amount, so it has no credit)
+            if "Receipt No" in receipt_no or "Completion Time" in completion_time:
                 continue
             
             # Skip empty rows or rows without paid in amount
             if not receipt_no and not details:
                 continue
             
-            # Parse date from completion time
-            tran_date = parse_date(completion_time)
+            # Parse date from completion time (already parsed unless it was recovered by the fallback scan)
+            if completion_from_column:
+                tran_date = completion_dates[row_offset]
+            else:
+                tran_date = parse_date(completion_time)
             if not tran_date:
                 continue
             
             # Parse amounts - process both Paid In (credits) and Withdrawn (debits)
-            credit = parse_amount(paid_in) if paid_in else None
-            debit = parse_amount(withdrawn) if withdrawn else None
+            # The column values are None for empty or invalid cells, or a positive float
+            credit = paid_in_values[row_offset]
+            debit = withdrawn_values[row_offset]
             
             # Skip if both credit and debit are None or zero
-            # Note: parse_amount returns None for invalid amounts, or a float (including 0.0) for valid amounts
             has_valid_credit = credit is not None and credit > 0
             has_valid_debit = debit is not None and debit > 0
             
@@ -298,29 +1288,72 @@ def parse_paybill_table(tables_data):
             credit = credit if credit is not None else 0.0
             debit = debit if debit is not None else 0.0
             
-            page_number = row_page_numbers[start_idx + row_offset] if row_page_numbers else None
-            table_index = row_table_indices[start_idx + row_offset] if row_table_indices else None
-
-            transactions.append({
-                'tran_date': tran_date,
-                'value_date': tran_date,
-                'particulars': details,
-                'credit': credit,
-                'debit': debit,
-                'balance': None,
-                'transaction_code': receipt_no if receipt_no else None,
-                'page_number': page_number,
-                'row_index': row_offset,
-                'table_index': table_index,
-                'source': 'paybill_table'
-            })
+            page_number, table_index = row_location(row_offset)
+
+            transactions.append(Transaction.parsed(
+                tran_date=tran_date,
+                particulars=details,
+                credit=credit,
+                debit=debit,
+                balance=None,
+                transaction_code=receipt_no if receipt_no else None,
+                page_number=page_number,
+                row_index=first_row_index + row_offset,
+                table_index=table_index,
+                source='paybill_table',
+            ))
         except Exception as e:
             print(f"Error parsing row: {e}", file=sys.stderr)
             continue
+
+    if stats is not None:
+        stats['paybill_rows'] = stats.get('paybill_rows', 0) + len(data_rows)
+        stats['paybill_fallback_rows'] = stats.get('paybill_fallback_rows', 0) + fallback_rows
     
     return transactions
 
 
+def new_paybill_state():
+    """Empty streaming state for ``parse_paybill_page``"""
+    return {'header': None, 'pending': [], 'tables': 0, 'rows': 0}
+
+
+def parse_paybill_page(tables, state, stats=None):
+    """Parse a paybill page's tables as soon as the export's header is known.
+
+    ``state`` (``new_paybill_state()``, plain JSON so it can be checkpointed)
+    holds the header, the tables held back until a table with a header has
+    been seen, and the running table and row counts, so ``table_index`` and
+    ``row_index`` come out as ``parse_paybill_table`` gives them for the whole
+    export. Returns the transactions of the rows parsed now.
+    """
+    for table in tables:
+        if table.get('header') and not state['header']:
+            state['header'] = table['header']
+        state['pending'].append(dict(table, table_index=state['tables']))
+        state['tables'] += 1
+    if not state['header']:
+        return []
+
+    columns = paybill_columns(state['header'])
+    transactions = []
+    for table in state['pending']:
+        rows = table.get('rows', []) or []
+        location = (table.get('page_number'), table['table_index'])
+        transactions.extend(parse_paybill_rows(rows, columns, lambda row_offset: location, state['rows'], stats))
+        state['rows'] += len(rows)
+    state['pending'] = []
+    return transactions
+
+
+def finish_paybill(state, stats=None):
+    """Rows still held back at the end of an export: none of its tables had a header,
+    so they are parsed together, looking for the header among the first rows"""
+    if state['header'] or not state['pending']:
+        return []
+    return parse_paybill_table(state['pending'], stats)
+
+
 def log_bank_skip(reason, row, page_number=None, row_offset=None, table_index=None, extra=None):
     """Emit detailed logging for skipped bank rows when debug mode is enabled."""
     if not PARSE_DEBUG:
@@ -360,11 +1393,18 @@ def log_text_skip(reason, line=None, page_number=None, line_index=None, extra=No
     debug_log(f"[TEXT_SKIP] {json.dumps(payload, ensure_ascii=False)}")
 
 
-def parse_bank_table(rows, header_row=None, page_number=None, table_index=None):
+def parse_bank_table(rows, header_row=None, page_number=None, table_index=None, profile=None):
     """Parse Bank statement table rows
     Columns: Tran Date, Value Date (ignore), Tran Particulars, Instrument Id (ignore), 
     Debit (ignore), Credit, Balance (ignore)
+
+    Column titles, footer/summary keywords and transaction markers come from
+    the bank ``profile`` (see ``bank_profiles``); the default profile is used
+    when none is given.
     """
+    profile = profile or bank_profile_for(None)
+    date_re = profile.date_re
+    scan_keywords = profile.keywords.scan
     transactions = []
     
     # Try to identify column indices from header if available
@@ -383,7 +1423,7 @@ def parse_bank_table(rows, header_row=None, page_number=None, table_index=None):
                 continue
             for i, cell in enumerate(row):
                 cell_str = str(cell).strip().upper() if cell else ""
-                if "CREDIT" in cell_str or "TRAN DATE" in cell_str or "PARTICULARS" in cell_str:
+                if profile.table_header_marker_re.search(cell_str):
                     header_row_found = row
                     header_row = row
                     break
@@ -392,21 +1432,18 @@ def parse_bank_table(rows, header_row=None, page_number=None, table_index=None):
     
     if header_row:
         for i, cell in enumerate(header_row):
-            cell_str = str(cell).strip().upper() if cell else ""
-            if "TRAN DATE" in cell_str or ("DATE" in cell_str and "VALUE" not in cell_str):
+            role = profile.column_role(str(cell).strip().upper() if cell else "")
+            if role == 'tran_date':
                 date_col = i
-            elif "PARTICULARS" in cell_str or "DETAILS" in cell_str or "DESCRIPTION" in cell_str or "NARRATIVE" in cell_str:
+            elif role == 'particulars':
                 particulars_col = i
-            elif "INSTRUMENT" in cell_str and "ID" in cell_str:
+            elif role == 'instrument_id':
                 instrument_id_col = i  # Track this - might contain part of particulars
-            elif "CREDIT" in cell_str:
-                # CRITICAL: Verify this is the Credit column by checking it's not Balance or Debit
-                # Only set credit_col if we explicitly see "CREDIT" in the header and it's not part of another word
-                if "BALANCE" not in cell_str and "DEBIT" not in cell_str:
-                    credit_col = i
-            elif "BALANCE" in cell_str:
+            elif role == 'credit':
+                credit_col = i
+            elif role == 'balance':
                 balance_col = i  # Track balance column to exclude it
-            elif "DEBIT" in cell_str:
+            elif role == 'debit':
                 debit_col = i  # Track debit column to exclude it
     
     # Process data rows - skip header row if found
@@ -450,9 +1487,9 @@ def parse_bank_table(rows, header_row=None, page_number=None, table_index=None):
             
             # Skip if this looks like a header row (but be less strict)
             row_str = ' '.join([str(c) for c in row if c]).upper()
+            row_hits = scan_keywords(row_str)
             # Only skip if it's clearly a header (contains multiple header keywords)
-            header_keywords = ["TRAN DATE", "CREDIT", "PARTICULARS", "VALUE DATE", "DEBIT", "BALANCE"]
-            header_count = sum(1 for keyword in header_keywords if keyword in row_str)
+            header_count = row_hits['table_header']
             if header_count >= 2:  # Only skip if it has 2+ header keywords
                 log_bank_skip(
                     "probable_header_row",
@@ -464,20 +1501,11 @@ def parse_bank_table(rows, header_row=None, page_number=None, table_index=None):
                 )
                 continue
             
-            # Skip footer sections and statement summaries
-            footer_keywords = [
-                "GRAND TOTAL", "TOTAL", "NOTE:", "ANY OMISSION", "ERRORS IN THIS STATEMENT",
-                "BRANCH MANAGER", "PROMPTLY ADVISED", "WITHIN 30 DAYS", "PRESUMED TO BE IN ORDER",
-                "ACCOUNT NO", "CUSTOMER NAME", "HEAD OFFICE", "P.O. BOX", "TEL:", "FAX:", "MOBILE:",
-                "EMAIL:", "EQUITY", "BANK", "STATEMENT", "PAGE",
-                # CRITICAL: Statement summary keywords to prevent balance rows being parsed as transactions
-                "END OF STATEMENT", "SUMMARY", "OPENING BALANCE", "CLOSING BALANCE",
-                "TOTAL DEBITS", "TOTAL CREDITS", "IMPORTANT NOTICE", "OPENING", "CLOSING",
-                "BROUGHT FORWARD", "CARRIED FORWARD", "BALANCE B/F", "BALANCE C/F"
-            ]
-            footer_count = sum(1 for keyword in footer_keywords if keyword in row_str)
+            # Skip footer sections and statement summaries (summary keywords keep
+            # balance rows from being parsed as transactions)
+            footer_count = row_hits['footer']
             # CRITICAL: Skip if "GRAND TOTAL" appears anywhere in the row (even in particulars)
-            if footer_count >= 2 or any(keyword in row_str for keyword in ["GRAND TOTAL", "NOTE:", "ANY OMISSION", "BRANCH MANAGER"]):
+            if footer_count >= 2 or row_hits['grand_total'] or row_hits['footer_anchor']:
                 log_bank_skip(
                     "footer_or_summary_row",
                     row,
@@ -492,7 +1520,7 @@ def parse_bank_table(rows, header_row=None, page_number=None, table_index=None):
             if particulars_col is not None and particulars_col < len(row):
                 particulars_cell = str(row[particulars_col]).strip().upper() if row[particulars_col] else ""
                 # CRITICAL: Skip if particulars contains "GRAND TOTAL" anywhere (even if combined with other text)
-                if "GRAND TOTAL" in particulars_cell:
+                if profile.grand_total_anchor in particulars_cell:
                     log_bank_skip(
                         "grand_total_in_particulars_col",
                         row,
@@ -502,7 +1530,7 @@ def parse_bank_table(rows, header_row=None, page_number=None, table_index=None):
                     )
                     continue
                 # Also skip if it's just "TOTAL" (likely a summary row)
-                if ("TOTAL" in particulars_cell) and len(particulars_cell) < 50:
+                if (profile.total_anchor in particulars_cell) and len(particulars_cell) < 50:
                     log_bank_skip(
                         "total_summary_row",
                         row,
@@ -538,7 +1566,7 @@ def parse_bank_table(rows, header_row=None, page_number=None, table_index=None):
                             # If Instrument Id has content and looks like part of particulars (has alphanumeric)
                             if instrument_str and len(instrument_str) > 0 and re.search(r'[A-Za-z0-9]', instrument_str):
                                 # Check if it's not just a date or amount
-                                is_date = bool(re.search(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}', instrument_str))
+                                is_date = bool(date_re.search(instrument_str))
                                 is_amount = parse_amount(instrument_str) is not None
                                 if not is_date and not is_amount:
                                     combined_parts.append(instrument_str)
@@ -556,30 +1584,18 @@ def parse_bank_table(rows, header_row=None, page_number=None, table_index=None):
                                 # Skip if it's clearly a date, amount, or header
                                 if next_cell_str and len(next_cell_str) > 0:
                                     # CRITICAL: Stop merging if we hit summary/footer keywords
-                                    summary_keywords = [
-                                        "END OF STATEMENT", "SUMMARY", "OPENING", "CLOSING", 
-                                        "TOTAL DEBITS", "TOTAL CREDITS", "IMPORTANT NOTICE"
-                                    ]
-                                    if any(keyword in next_cell_str.upper() for keyword in summary_keywords):
+                                    if profile.merge_stop_re.search(next_cell_str.upper()):
                                         break  # Don't merge summary text into particulars
                                     
                                     # CRITICAL: Stop merging if we hit transaction boundary markers
-                                    # These indicate the start of a NEW transaction, not continuation of current one
-                                    transaction_markers = [
-                                        r'^APP/',      # APP/CUSTOMER NAME pattern
-                                        r'^BY:/',      # BY:/reference pattern
-                                        r'^MPS\s+\d',  # MPS followed by phone/code
-                                        r'^FROM:',     # FROM: sender pattern
-                                        r'^TO:',       # TO: recipient pattern
-                                        r'^\d{12}',    # 12+ digit codes at start (like 454787546843)
-                                    ]
-                                    is_new_transaction = any(re.match(pattern, next_cell_str, re.IGNORECASE) for pattern in transaction_markers)
-                                    if is_new_transaction:
+                                    # (APP/, BY:/, MPS <code>, 12-digit codes...). These indicate
+                                    # the start of a NEW transaction, not continuation of current one
+                                    if profile.boundary_marker_re.match(next_cell_str):
                                         break  # Don't merge next transaction into current particulars
                                     
-                                    is_date = bool(re.search(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}', next_cell_str))
+                                    is_date = bool(date_re.search(next_cell_str))
                                     is_amount = parse_amount(next_cell_str) is not None
-                                    is_header = any(keyword in next_cell_str.upper() for keyword in ["CREDIT", "DEBIT", "BALANCE", "INSTRUMENT"])
+                                    is_header = bool(profile.amount_titles_re.search(next_cell_str.upper()))
                                     
                                     # If it's not a date, amount, or header, it might be part of particulars
                                     if not is_date and not is_amount and not is_header:
@@ -595,14 +1611,8 @@ def parse_bank_table(rows, header_row=None, page_number=None, table_index=None):
                         particulars = ' '.join([p for p in combined_parts if p]).strip()
                         
                         # CRITICAL: Remove footer text from particulars if it got included
-                        footer_patterns = [
-                            r'Note:.*?presumed to be in order.*?',
-                            r'Note:.*?Branch Manager.*?',
-                            r'Any omission or errors.*?presumed to be in order.*?',
-                            r'MN\d+',  # Footer reference numbers
-                        ]
-                        for pattern in footer_patterns:
-                            particulars = re.sub(pattern, '', particulars, flags=re.IGNORECASE | re.DOTALL)
+                        for footer_re in profile.footer_strip_res:
+                            particulars = footer_re.sub('', particulars)
                         particulars = re.sub(r'\s+', ' ', particulars).strip()
             
             if credit_col is not None and credit_col < len(row):
@@ -640,11 +1650,11 @@ def parse_bank_table(rows, header_row=None, page_number=None, table_index=None):
                     cell_str = str(cell).strip() if cell else ""
                     
                     # Skip if it contains "Balance" or "Debit" text
-                    if "balance" in cell_str.lower() or "debit" in cell_str.lower():
+                    if profile.excluded_amount_labels_re.search(cell_str.upper()):
                         continue
                     
                     # Tran Date contains date pattern
-                    if not tran_date and re.search(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}', cell_str):
+                    if not tran_date and date_re.search(cell_str):
                         tran_date = cell_str
                     
                     # Particulars is usually a text field (not just numbers)
@@ -653,7 +1663,7 @@ def parse_bank_table(rows, header_row=None, page_number=None, table_index=None):
                         # Check if it contains letters (not just numbers/dates)
                         has_letters = bool(re.search(r'[A-Za-z]', cell_str))
                         # Check if it's not just a date or amount
-                        is_not_date = not re.search(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}', cell_str)
+                        is_not_date = not date_re.search(cell_str)
                         is_not_amount = not parse_amount(cell_str)
                         
                         # If it has letters and is not a date/amount, it's likely particulars
@@ -665,7 +1675,7 @@ def parse_bank_table(rows, header_row=None, page_number=None, table_index=None):
                     
                     # Credit is a positive numeric amount
                     # Skip if it looks like a date
-                    if credit is None and not re.search(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}', cell_str):
+                    if credit is None and not date_re.search(cell_str):
                         # CRITICAL: Exclude phone numbers - must have decimal or comma for currency
                         cleaned_cell = cell_str.replace(' ', '').replace(',', '').replace('.', '')
                         # Skip if it's too long without decimals/commas (likely phone number)
@@ -708,12 +1718,7 @@ def parse_bank_table(rows, header_row=None, page_number=None, table_index=None):
                 possible_value = str(row[possible_balance_idx]).strip() if row[possible_balance_idx] else ""
                 if possible_value:
                     # CRITICAL: Skip if the row context references balance, summary, or statement end
-                    context_upper = row_str.upper()
-                    balance_indicators = [
-                        "BALANCE", "BAL.", "B/F", "C/F", "CARRIED FORWARD", "BROUGHT FORWARD",
-                        "OPENING", "CLOSING", "SUMMARY", "END OF STATEMENT", "TOTAL DEBITS", "TOTAL CREDITS"
-                    ]
-                    if not any(keyword in context_upper for keyword in balance_indicators):
+                    if not row_hits['balance_indicator']:
                         possible_amount = parse_amount(possible_value)
                         if possible_amount and possible_amount > 0:
                             credit = possible_amount
@@ -738,7 +1743,7 @@ def parse_bank_table(rows, header_row=None, page_number=None, table_index=None):
             # CRITICAL: Final check - skip if particulars contains "Grand Total" even after all other checks
             if particulars_col is not None and particulars_col < len(row):
                 particulars_final_check = str(row[particulars_col]).strip().upper() if row[particulars_col] else ""
-                if "GRAND TOTAL" in particulars_final_check:
+                if profile.grand_total_anchor in particulars_final_check:
                     log_bank_skip(
                         "grand_total_post_header_check",
                         row,
@@ -760,7 +1765,7 @@ def parse_bank_table(rows, header_row=None, page_number=None, table_index=None):
                 continue
             
             # Parse date
-            parsed_date = parse_date(tran_date)
+            parsed_date = parse_date(tran_date, profile.date_formats)
             if not parsed_date:
                 log_bank_skip(
                     "unparsable_tran_date",
@@ -773,7 +1778,7 @@ def parse_bank_table(rows, header_row=None, page_number=None, table_index=None):
                 continue
             
             # CRITICAL: Additional check - if particulars contains "Grand Total" after parsing, skip
-            if particulars and "GRAND TOTAL" in particulars.upper():
+            if particulars and profile.grand_total_anchor in particulars.upper():
                 log_bank_skip(
                     "grand_total_in_recovered_particulars",
                     row,
@@ -790,7 +1795,7 @@ def parse_bank_table(rows, header_row=None, page_number=None, table_index=None):
             # Look for debit column if identified
             if debit_col is not None and debit_col < len(row):
                 debit_cell = str(row[debit_col]).strip() if row[debit_col] else ""
-                if debit_cell and debit_cell.lower() not in ['debit', 'withdrawn', '-', 'n/a']:
+                if debit_cell and debit_cell.upper() not in profile.empty_amount_cells:
                     debit_amount = parse_amount(debit_cell)
                     if debit_amount and debit_amount > 0:
                         debit_candidates.append({
@@ -825,9 +1830,7 @@ def parse_bank_table(rows, header_row=None, page_number=None, table_index=None):
             
             # CRITICAL: Detect merged rows (multiple transactions combined into one)
             # Check if particulars contains multiple transaction codes (merged rows)
-            mps_count = len(re.findall(r'\bMPS\s+\d{12}', particulars or ''))
-            app_count = len(re.findall(r'\bAPP/', particulars or ''))
-            merged_transactions = mps_count + app_count
+            merged_transactions = sum(len(marker_re.findall(particulars or '')) for marker_re in profile.merged_row_res)
             
             if merged_transactions > 1:
                 log_bank_skip(
@@ -844,12 +1847,8 @@ def parse_bank_table(rows, header_row=None, page_number=None, table_index=None):
                 continue
             
             # CRITICAL: Detect implausibly large amounts that are likely running balances
-            if credit > 500000:
-                row_context = ' '.join([str(c) for c in row if c]).upper()
-                balance_context_keywords = [
-                    "BALANCE", "CLOSING", "OPENING", "SUMMARY", "TOTAL", "B/F", "C/F"
-                ]
-                has_balance_keyword = any(keyword in row_context for keyword in balance_context_keywords)
+            if credit > profile.implausible_credit:
+                has_balance_keyword = row_hits['balance_context'] > 0
                 
                 if has_balance_keyword:
                     log_bank_skip(
@@ -882,20 +1881,13 @@ def parse_bank_table(rows, header_row=None, page_number=None, table_index=None):
                     cell_str = str(cell).strip() if cell else ""
                     if cell_str and cell_str != tran_date:
                         # Skip if it contains "Balance", "Debit", "Credit", "Instrument" text
-                        if any(keyword in cell_str.lower() for keyword in ["balance", "debit", "credit", "instrument", "value date"]):
+                        if profile.label_cells_re.search(cell_str.upper()):
                             continue
                         # Skip if it's a date
-                        if re.search(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}', cell_str):
+                        if date_re.search(cell_str):
                             continue
                         # CRITICAL: Skip if it's a transaction boundary marker (new transaction starting)
-                        transaction_markers = [
-                            r'^APP/',      # APP/CUSTOMER NAME pattern
-                            r'^BY:/',      # BY:/reference pattern
-                            r'^MPS\s+\d',  # MPS followed by phone/code
-                            r'^FROM:',     # FROM: sender pattern
-                            r'^TO:',       # TO: recipient pattern
-                        ]
-                        is_new_transaction = any(re.match(pattern, cell_str, re.IGNORECASE) for pattern in transaction_markers)
+                        is_new_transaction = bool(profile.transaction_marker_re.match(cell_str))
                         if is_new_transaction and len(other_cells) > 0:  # Only skip if we already have some particulars
                             break  # Stop combining - we've hit the next transaction
                         
@@ -932,7 +1924,7 @@ def parse_bank_table(rows, header_row=None, page_number=None, table_index=None):
                 # Remove multiple consecutive newlines
                 particulars = re.sub(r'\n+', ' ', particulars)
                 # Remove standalone dates (they shouldn't be in particulars)
-                particulars = re.sub(r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b', '', particulars)
+                particulars = profile.date_word_re.sub('', particulars)
                 particulars = particulars.strip()
                 # Limit length to prevent database issues
                 if len(particulars) > 1000:
@@ -952,12 +1944,8 @@ def parse_bank_table(rows, header_row=None, page_number=None, table_index=None):
             # CRITICAL: Check for footer/summary keywords AFTER cell merging
             # (Footer text might have been merged into particulars after initial check)
             particulars_upper = particulars.upper()
-            footer_indicators = [
-                "END OF STATEMENT", "SUMMARY", "OPENING BALANCE", "CLOSING BALANCE",
-                "TOTAL DEBITS", "TOTAL CREDITS", "IMPORTANT NOTICE", "PLEASE EXAMINE",
-                "GRAND TOTAL", "BROUGHT FORWARD", "CARRIED FORWARD", "BALANCE B/F", "BALANCE C/F"
-            ]
-            footer_found_count = sum(1 for keyword in footer_indicators if keyword in particulars_upper)
+            particulars_hits = scan_keywords(particulars_upper)
+            footer_found_count = particulars_hits['closing']
             
             # CRITICAL: Also check for dash separator patterns (often precede "End of Statement")
             has_dash_separator = bool(re.search(r'-{3,}', particulars))  # 3+ consecutive dashes
@@ -965,8 +1953,7 @@ def parse_bank_table(rows, header_row=None, page_number=None, table_index=None):
             # Skip if we find 2+ footer keywords OR specific critical keywords OR dash separator + footer keyword
             if footer_found_count >= 2 or \
                (has_dash_separator and footer_found_count >= 1) or \
-               any(keyword in particulars_upper for keyword in 
-                   ["END OF STATEMENT", "IMPORTANT NOTICE", "PLEASE EXAMINE YOUR STATEMENT"]):
+               particulars_hits['closing_anchor']:
                 log_bank_skip(
                     "footer_text_in_final_particulars",
                     row,
@@ -981,236 +1968,326 @@ def parse_bank_table(rows, header_row=None, page_number=None, table_index=None):
             # Extract transaction code from particulars
             transaction_code = extract_transaction_code(particulars)
             
-            transaction_data = {
-                'tran_date': parsed_date,
-                'value_date': parsed_date,
-                'particulars': particulars,
-                'credit': credit,
-                'debit': debit,
-                'balance': None,
-                'transaction_code': transaction_code
-            }
-            
-            transaction_data['page_number'] = page_number
-            transaction_data['row_index'] = row_offset
-            if table_index is not None:
-                transaction_data['table_index'] = table_index
-            transaction_data['source'] = 'bank_table'
-            transactions.append(transaction_data)
+            transactions.append(Transaction.parsed(
+                tran_date=parsed_date,
+                particulars=particulars,
+                credit=credit,
+                debit=debit,
+                balance=None,
+                transaction_code=transaction_code,
+                page_number=page_number,
+                row_index=row_offset,
+                table_index=table_index,
+                source='bank_table',
+            ))
         except Exception as e:
             print(f"Error parsing bank row: {e}", file=sys.stderr)
             continue
     
     return transactions
 
-def detect_table_rows(text, page_number=None, initial_balance=None):
-    """Detect transaction rows from text (fallback method) - improved for bank statements"""
-    transactions = []
-    lines = text.split('\n')
-    prev_balance = initial_balance
+# What classify_text_lines makes of a line as a possible transaction start
+LINE_BLANK = 'blank'              # empty or too short to be a row
+LINE_GRAND_TOTAL = 'grand_total'  # grand total line with no dated row before the total
+LINE_FOOTER = 'footer'            # footer notice or statement summary
+LINE_HEADER = 'header'            # column titles or bank letterhead
+LINE_UNDATED = 'undated'          # no date
+LINE_BAD_DATE = 'bad_date'        # a date parse_date rejects
+LINE_DATED = 'dated'              # starts a transaction
+
+# log_text_skip reason for each line kind that does not start a transaction
+TEXT_SKIP_REASONS = {
+    LINE_BLANK: "blank_or_short_line",
+    LINE_GRAND_TOTAL: "grand_total_line",
+    LINE_FOOTER: "footer_or_summary_line",
+    LINE_HEADER: "header_line",
+    LINE_UNDATED: "no_date_found",
+    LINE_BAD_DATE: "unparsable_date",
+}
+
+# Shortest line that can start a transaction
+TEXT_ROW_MIN_LENGTH = 10
+# Lines after a dated line that can carry the rest of its particulars
+TEXT_ROW_LOOKAHEAD = 5
+
+DR_WORD_RE = re.compile(r'\bDR\b')
+WHITESPACE_RUN_RE = re.compile(r'\s+')
+DASH_RUN_RE = re.compile(r'-{3,}')
+# Numbers with decimals left in particulars once the row's own amounts are removed,
+# e.g. "2,000.00" or "490441.00"
+STRAY_AMOUNT_RES = (
+    re.compile(r'\b[\d,]+\.\d{2}\b'),
+    re.compile(r'\b[\d,]{4,}\.\d{0,2}\b'),
+)
+
+
+@lru_cache(maxsize=4096)
+def amount_word_re(amount):
+    """Regex for one amount as a whole word, to cut it out of particulars"""
+    return re.compile(r'\b' + re.escape(amount) + r'\b')
+
+
+def classify_text_lines(lines, profile):
+    """Phase one of ``detect_table_rows``: classify every line of a page once.
+
+    Each entry holds the stripped line (``text``) and its two possible roles:
+
+    - as the start of a transaction: ``kind`` (a ``LINE_*`` value), the text
+      that role sees (``row_text``, cut before a grand total that follows a
+      dated row), the parsed ``tran_date`` of ``LINE_DATED`` lines, and the
+      ``extra`` detail logged when the line is skipped;
+    - as a follow-on line of the dated row above: ``continues`` is True when
+      it extends the row's particulars (no date, or a continuation reference
+      such as ``BY:/``, and no footer text), False when it ends the row and
+      None for blank lines, which are passed over.
+    """
+    date_re = profile.date_re
+    grand_total_anchor = profile.grand_total_anchor
+    scan_keywords = profile.keywords.scan
+    continuation_prefixes = profile.continuation_prefixes
+
+    entries = []
+    for raw_line in lines:
+        text = raw_line.strip()
+        entry = {'text': text, 'row_text': text, 'kind': LINE_BLANK, 'tran_date': None,
+                 'extra': None, 'continues': None}
+        entries.append(entry)
+        if not text:
+            continue
 
-    def looks_like_currency(amount_str: str) -> bool:
-        if not amount_str:
-            return False
-        amount_str = amount_str.strip()
+        upper = text.upper()
+        hits = scan_keywords(upper)
+        date_match = date_re.search(text)
+        if date_match and not upper.startswith(continuation_prefixes):
+            entry['continues'] = False
+        else:
+            entry['continues'] = not hits['footer_line']
 
-        has_decimal = amount_str.count('.') == 1
-        has_comma = ',' in amount_str
-        if not has_decimal and not has_comma:
-            return False
+        if len(text) < TEXT_ROW_MIN_LENGTH:
+            continue
 
-        if has_decimal:
-            integer_part, decimal_part = amount_str.split('.', 1)
-            if not decimal_part.isdigit() or len(decimal_part) != 2:
-                return False
-        else:
-            integer_part = amount_str
+        row_text = text
+        if grand_total_anchor in upper:
+            prefix = text[:upper.find(grand_total_anchor)].strip()
+            if not (prefix and date_re.search(prefix)):
+                entry['kind'] = LINE_GRAND_TOTAL
+                continue
+            # Keep the transaction in front of the Grand Total
+            row_text = prefix
+            entry['row_text'] = row_text
+            hits = scan_keywords(row_text.upper())
+            date_match = date_re.search(row_text)
+
+        footer_count = hits['footer']
+        has_summary = hits['summary'] > 0
+        if footer_count >= 2 or has_summary or hits['footer_anchor']:
+            entry['kind'] = LINE_FOOTER
+            entry['extra'] = {'footer_keywords_found': footer_count, 'has_summary': has_summary}
+            continue
 
-        integer_digits = integer_part.replace(',', '').replace(' ', '')
-        if not integer_digits.isdigit():
-            return False
+        header_count = hits['text_header']
+        if header_count >= 2:
+            entry['kind'] = LINE_HEADER
+            entry['extra'] = {'header_keywords_found': header_count}
+            continue
 
-        if len(integer_digits) == 0:
-            return False
+        if not date_match:
+            entry['kind'] = LINE_UNDATED
+            continue
 
-        return True
-    
-    # Pattern for transaction rows: date, particulars, amount
-    date_pattern = r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}'
-    amount_pattern = r'[\d,]+\.?\d{0,2}'
-    
-    # Footer keywords to skip (including statement summaries)
-    footer_keywords = [
-        "GRAND TOTAL", "TOTAL", "NOTE:", "ANY OMISSION", "ERRORS IN THIS STATEMENT",
-        "BRANCH MANAGER", "PROMPTLY ADVISED", "WITHIN 30 DAYS", "PRESUMED TO BE IN ORDER",
-        "ACCOUNT NO", "CUSTOMER NAME", "HEAD OFFICE", "P.O. BOX", "TEL:", "FAX:", "MOBILE:",
-        "EMAIL:", "EQUITY", "BANK", "STATEMENT", "PAGE",
-        # CRITICAL: Statement summary keywords
-        "END OF STATEMENT", "SUMMARY", "OPENING BALANCE", "CLOSING BALANCE",
-        "TOTAL DEBITS", "TOTAL CREDITS", "IMPORTANT NOTICE", "OPENING", "CLOSING",
-        "BROUGHT FORWARD", "CARRIED FORWARD", "BALANCE B/F", "BALANCE C/F"
-    ]
-    
-    # Header keywords to skip
-    header_keywords = [
-        "TRAN DATE", "VALUE DATE", "PARTICULARS", "CREDIT", "DEBIT", "BALANCE", "INSTRUMENT",
-        "ACCOUNT NO", "CUSTOMER NAME", "HEAD OFFICE", "P.O. BOX", "TEL:", "FAX:", "MOBILE:",
-        "EMAIL:", "EQUITY", "BANK", "STATEMENT"
-    ]
-    
-    i = 0
-    while i < len(lines):
-        line_index = i
-        line = lines[i].strip()
-        if not line or len(line) < 10:
-            log_text_skip(
-                "blank_or_short_line",
-                line=line,
-                page_number=page_number,
-                line_index=line_index,
-            )
-            i += 1
+        date_str = date_match.group()
+        tran_date = parse_date(date_str, profile.date_formats)
+        if not tran_date:
+            entry['kind'] = LINE_BAD_DATE
+            entry['extra'] = {'date_str': date_str}
             continue
-        
-        line_upper = line.upper()
-        
-        # Handle lines that contain "Grand Total"
-        if "GRAND TOTAL" in line_upper:
-            grand_total_idx = line_upper.find("GRAND TOTAL")
-            prefix = line[:grand_total_idx].strip()
-            if prefix and re.search(date_pattern, prefix):
-                # Trim the Grand Total portion and proceed with the prefix (actual transaction)
-                line = prefix
-                line_upper = line.upper()
-            else:
-                log_text_skip(
-                    "grand_total_line",
-                    line=line,
-                    page_number=page_number,
-                    line_index=line_index,
-                )
-                i += 1
+
+        entry['kind'] = LINE_DATED
+        entry['tran_date'] = tran_date
+    return entries
+
+
+def balance_chain_amount(amount_tokens, balance_value, prev_balance):
+    """Signed cents of the amount a text row's running balance vouches for, or None.
+
+    ``amount_tokens`` are the row's ``scan_amount_token`` results; its last
+    currency amount is the balance. When ``balance - prev_balance`` equals one
+    of the other currency amounts (the nearest to the balance wins), returns
+    that amount in cents - positive for a credit, negative for a debit.
+    """
+    if balance_value is None or prev_balance is None:
+        return None
+    delta = round(balance_value * 100) - round(prev_balance * 100)
+    if not delta:
+        return None
+    currency_cents = [cents for kind, cents in amount_tokens if kind == TOKEN_CURRENCY]
+    if abs(delta) in currency_cents[:-1]:
+        return delta
+    return None
+
+
+def pick_credit_candidate(full_line, amount_matches, amount_tokens, profile):
+    """Credit amount of a text row whose running balance can't vouch for it, 0.0 if none.
+
+    Scores the row's amount tokens from the right: currency-formatted, not
+    touching letters, not next to one of the profile's excluded amount labels
+    (Balance/Debit) or a DR marker, and followed by another currency amount
+    (the balance).
+    """
+    # currency_after[k]: whether a currency amount follows token k on the line
+    currency_after = [False] * len(amount_tokens)
+    for k in range(len(amount_tokens) - 2, -1, -1):
+        currency_after[k] = currency_after[k + 1] or amount_tokens[k + 1][0] == TOKEN_CURRENCY
+
+    # Find the credit amount - look for amounts that look like currency (have .00 or commas)
+    # CRITICAL: Exclude phone numbers, transaction codes, and other non-amount numbers
+    # Strategy: Look for amounts that:
+    # 1. Have decimal point with 2 decimal places (.00)
+    # 2. OR have comma thousands separator
+    # 3. Are in a reasonable range (0.01 to 1 billion)
+    # 4. Are NOT part of transaction codes (like TD45E3DTYR)
+    # 5. Are NOT phone numbers (9-12 digits without decimals/commas)
+
+    for token_index in range(len(amount_matches) - 1, -1, -1):
+        match = amount_matches[token_index]
+        amount_str = match.group()
+        try:
+            # Skip phone numbers (9-12 digits without decimals/commas)
+            if amount_tokens[token_index][0] == TOKEN_PHONE:
                 continue
-        
-        # Skip footer sections (check for multiple footer keywords)
-        footer_count = sum(1 for keyword in footer_keywords if keyword in line_upper)
-        # CRITICAL: Also check for statement summary keywords
-        summary_indicators = ["END OF STATEMENT", "SUMMARY", "OPENING BALANCE", "CLOSING BALANCE", 
-                              "TOTAL DEBITS", "TOTAL CREDITS", "IMPORTANT NOTICE"]
-        has_summary = any(keyword in line_upper for keyword in summary_indicators)
-        
-        if footer_count >= 2 or has_summary or any(keyword in line_upper for keyword in ["NOTE:", "ANY OMISSION", "BRANCH MANAGER"]):
-            log_text_skip(
-                "footer_or_summary_line",
-                line=line,
-                page_number=page_number,
-                line_index=line_index,
-                extra={'footer_keywords_found': footer_count, 'has_summary': has_summary}
-            )
-            i += 1
-            continue
-        
-        # Skip header rows
-        header_count = sum(1 for keyword in header_keywords if keyword in line_upper)
-        if header_count >= 2:
-            log_text_skip(
-                "header_line",
-                line=line,
-                page_number=page_number,
-                line_index=line_index,
-                extra={'header_keywords_found': header_count}
-            )
-            i += 1
-            continue
-        
-        # Check if line contains a date
-        date_match = re.search(date_pattern, line)
-        if not date_match:
-            log_text_skip(
-                "no_date_found",
-                line=line,
-                page_number=page_number,
-                line_index=line_index,
-            )
-            i += 1
+
+            amount_pos = match.start()
+            right_index = match.end()
+
+            # Only skip if alphanumeric characters are touching the amount with no whitespace
+            left_touching = amount_pos > 0 and not full_line[amount_pos - 1].isspace()
+            right_touching = right_index < len(full_line) and not full_line[right_index].isspace()
+
+            if left_touching:
+                left_char = full_line[amount_pos - 1]
+                if left_char.isalpha():
+                    continue
+            if right_touching:
+                right_char = full_line[right_index]
+                if right_char.isalpha():
+                    continue
+
+            amount_val = float(amount_str.replace(',', ''))
+
+            # Check if it's a reasonable credit amount
+            if 0.01 <= amount_val <= 1000000000:
+                # Must have decimal point with 2 places OR comma thousands separator
+                # This ensures we're getting currency amounts, not transaction codes
+                has_decimal = '.' in amount_str and amount_str.count('.') == 1
+                has_comma = ',' in amount_str
+
+                if has_decimal:
+                    # Check if it has exactly 2 decimal places (currency format)
+                    decimal_parts = amount_str.split('.')
+                    if len(decimal_parts) == 2 and len(decimal_parts[1]) == 2:
+                        # CRITICAL: Check context - must NOT be Balance or Debit
+                        context_upper = full_line[max(0, amount_pos-30):amount_pos+30].upper()
+                        # Skip if it's clearly in Balance or Debit context
+                        if (
+                            profile.excluded_amount_labels_re.search(context_upper)
+                            or DR_WORD_RE.search(context_upper)
+                        ):
+                            continue
+                        # Prefer amounts that appear after particulars (Credit column position)
+                        # In bank statements: Date | Particulars | Credit | Balance
+                        # Credit is usually the second-to-last amount, Balance is the last
+                        # Check if there's another amount after this one (likely Balance)
+                        # If there's another amount after this, and it's larger, this might be Credit
+                        # But if this is the last amount, it might be Balance
+                        if currency_after[token_index]:
+                            # There's another amount after - this could be Credit
+                            # Note: Large amounts (>50K) will be flagged later, not rejected here
+                            return amount_val
+                        else:
+                            # This is the last amount - might be Balance, skip it
+                            continue
+                elif has_comma:
+                    # Has comma thousands separator - likely currency
+                    context_upper = full_line[max(0, amount_pos-30):amount_pos+30].upper()
+                    # Skip if it's clearly in Balance or Debit context
+                    if (
+                        profile.excluded_amount_labels_re.search(context_upper)
+                        or DR_WORD_RE.search(context_upper)
+                    ):
+                        continue
+                    # Check if there's another amount after this
+                    if currency_after[token_index]:
+                        # There's another amount after - this could be Credit
+                        # Note: Large amounts (>50K) will be flagged later, not rejected here
+                        if amount_val < 10000:
+                            return amount_val
+                        # For larger numbers, prefer those with decimals
+                        elif '.' in full_line[max(0, amount_pos-5):amount_pos+5]:
+                            return amount_val
+                    else:
+                        # This is the last amount - might be Balance, skip it
+                        continue
+        except:
             continue
-        
-        # Extract date
-        date_str = date_match.group()
-        tran_date = parse_date(date_str)
-        if not tran_date:
+    return 0.0
+
+
+def detect_table_rows(text, page_number=None, initial_balance=None, profile=None, first_line_index=0):
+    """Detect transaction rows from text (fallback method) - improved for bank statements
+
+    Keywords, markers and date/amount patterns come from the bank ``profile``
+    (the default profile when none is given). Lines are numbered from
+    ``first_line_index`` (a cropped page's ``line_offset``).
+    """
+    profile = profile or bank_profile_for(None)
+    date_re = profile.date_re
+    amount_re = profile.amount_re
+    scan_keywords = profile.keywords.scan
+    transactions = []
+    lines = text.split('\n')
+    prev_balance = initial_balance
+
+    entries = classify_text_lines(lines, profile)
+
+    i = 0
+    while i < len(entries):
+        line_index = first_line_index + i
+        entry = entries[i]
+        line = entry['row_text']
+        if entry['kind'] != LINE_DATED:
             log_text_skip(
-                "unparsable_date",
+                TEXT_SKIP_REASONS[entry['kind']],
                 line=line,
                 page_number=page_number,
                 line_index=line_index,
-                extra={'date_str': date_str}
+                extra=entry['extra'],
             )
             i += 1
             continue
+        tran_date = entry['tran_date']
         
         # Try to get the full transaction by combining with next lines if needed
         # Bank statements often have particulars split across multiple lines
-        full_line = line
+        parts = [line]
         next_i = i + 1
-        # Look ahead up to 5 lines to capture complete particulars
-        while next_i < len(lines) and next_i <= i + 5:
-            next_line = lines[next_i].strip()
-            if not next_line:
+        # Look ahead up to 5 lines to capture complete particulars; a dated line
+        # (other than a continuation reference) or footer text ends the row
+        while next_i < len(entries) and next_i <= i + TEXT_ROW_LOOKAHEAD:
+            continues = entries[next_i]['continues']
+            if continues is None:
                 next_i += 1
                 continue
-            
-            next_line_upper = next_line.upper()
-
-            # Determine if this is a continuation line (e.g., BY:/... reference)
-            continuation_prefixes = ("BY:/", "BY :/", "BY:", "BY /", "BY-")
-            is_reference_line = next_line_upper.startswith(continuation_prefixes)
-
-            # If next line has a date and isn't a known continuation, we've moved on
-            if re.search(date_pattern, next_line) and not is_reference_line:
-                break
-            
-            # Check if next line contains footer text - if so, stop combining
-            footer_keywords_in_line = [
-                "NOTE:", "ANY OMISSION", "ERRORS IN THIS STATEMENT", "BRANCH MANAGER",
-                "PROMPTLY ADVISED", "WITHIN 30 DAYS", "PRESUMED TO BE IN ORDER", "GRAND TOTAL"
-            ]
-            if any(keyword in next_line_upper for keyword in footer_keywords_in_line):
-                # Footer detected - stop combining
-                break
-            
-            # Always combine with next line if it doesn't have a date or is a known continuation
-            # This ensures we capture the full particulars even if split
-            if not re.search(date_pattern, next_line) or is_reference_line:
-                full_line += " " + next_line
-                next_i += 1
-                # Stop if we've found what looks like a complete transaction (has amount)
-                # But continue if we're still building particulars
-                if re.search(amount_pattern, full_line):
-                    # Check if we have a reasonable amount - if yes, might be complete
-                    amounts_found = re.findall(amount_pattern, full_line)
-                    has_reasonable_amount = False
-                    for amt in amounts_found:
-                        try:
-                            val = float(amt.replace(',', ''))
-                            # Check if it's a reasonable credit (not a phone number)
-                            # Phone numbers are 9-12 digits without decimals
-                            if 0.01 <= val <= 1000000000 and ('.' in amt or ',' in amt):
-                                has_reasonable_amount = True
-                                break
-                        except:
-                            pass
-                    if has_reasonable_amount:
-                        # Might be complete, but continue one more line to be sure
-                        continue
-            else:
+            if not continues:
                 break
+            parts.append(entries[next_i]['text'])
+            next_i += 1
+        full_line = " ".join(parts)
         
         full_line_upper = full_line.upper()
-        if "GRAND TOTAL" in full_line_upper:
-            grand_total_idx = full_line_upper.find("GRAND TOTAL")
+        if profile.grand_total_anchor in full_line_upper:
+            grand_total_idx = full_line_upper.find(profile.grand_total_anchor)
             prefix = full_line[:grand_total_idx].strip()
-            if prefix and re.search(date_pattern, prefix):
+            if prefix and date_re.search(prefix):
                 full_line = prefix
             else:
                 log_text_skip(
@@ -1228,7 +2305,7 @@ def detect_table_rows(text, page_number=None, initial_balance=None):
         # The credit amount is usually the last numeric value with .00 or comma formatting
         
         # First, try to find amounts that look like currency (have .00 or commas)
-        amount_matches = list(re.finditer(amount_pattern, full_line))
+        amount_matches = list(amount_re.finditer(full_line))
         if not amount_matches:
             log_text_skip(
                 "no_amounts_detected",
@@ -1240,7 +2317,9 @@ def detect_table_rows(text, page_number=None, initial_balance=None):
             continue
 
         amounts = [match.group() for match in amount_matches]
-        currency_amounts = [amt for amt in amounts if looks_like_currency(amt)]
+        # Each token is classified (currency, phone number, ...) once
+        amount_tokens = [scan_amount_token(amt) for amt in amounts]
+        currency_amounts = [amt for amt, (kind, _) in zip(amounts, amount_tokens) if kind == TOKEN_CURRENCY]
         if not currency_amounts:
             log_text_skip(
                 "no_currency_amounts",
@@ -1252,159 +2331,41 @@ def detect_table_rows(text, page_number=None, initial_balance=None):
             continue
 
         balance_value = parse_amount(currency_amounts[-1])
-        amount_candidate_value = parse_amount(currency_amounts[-2]) if len(currency_amounts) >= 2 else None
-        
-        # Only process credit transactions, ignore debits
-        credit = 0.0
-        
-        # Find the credit amount - look for amounts that look like currency (have .00 or commas)
-        # CRITICAL: Exclude phone numbers, transaction codes, and other non-amount numbers
-        # Strategy: Look for amounts that:
-        # 1. Have decimal point with 2 decimal places (.00)
-        # 2. OR have comma thousands separator
-        # 3. Are in a reasonable range (0.01 to 1 billion)
-        # 4. Are NOT part of transaction codes (like TD45E3DTYR)
-        # 5. Are NOT phone numbers (9-12 digits without decimals/commas)
-        
-        for match in reversed(amount_matches):
-            amount_str = match.group()
-            try:
-                # Skip if it doesn't look like a currency amount
-                cleaned_amount = amount_str.replace(',', '').replace('.', '')
-                
-                # Skip phone numbers (9-12 digits without decimals/commas)
-                if len(cleaned_amount) >= 9 and len(cleaned_amount) <= 12 and '.' not in amount_str and ',' not in amount_str:
-                    continue
-                
-                amount_pos = match.start()
-                right_index = match.end()
 
-                # Only skip if alphanumeric characters are touching the amount with no whitespace
-                left_touching = amount_pos > 0 and not full_line[amount_pos - 1].isspace()
-                right_touching = right_index < len(full_line) and not full_line[right_index].isspace()
-
-                if left_touching:
-                    left_char = full_line[amount_pos - 1]
-                    if left_char.isalpha():
-                        continue
-                if right_touching:
-                    right_char = full_line[right_index]
-                    if right_char.isalpha():
-                        continue
-                
-                amount_val = float(amount_str.replace(',', ''))
-                
-                # Check if it's a reasonable credit amount
-                if 0.01 <= amount_val <= 1000000000:
-                    # Must have decimal point with 2 places OR comma thousands separator
-                    # This ensures we're getting currency amounts, not transaction codes
-                    has_decimal = '.' in amount_str and amount_str.count('.') == 1
-                    has_comma = ',' in amount_str
-                    
-                    if has_decimal:
-                        # Check if it has exactly 2 decimal places (currency format)
-                        decimal_parts = amount_str.split('.')
-                        if len(decimal_parts) == 2 and len(decimal_parts[1]) == 2:
-                            # CRITICAL: Check context - must NOT be Balance or Debit
-                            context_upper = full_line[max(0, amount_pos-30):amount_pos+30].upper()
-                            # Skip if it's clearly in Balance or Debit context
-                            if (
-                                'BALANCE' in context_upper
-                                or 'DEBIT' in context_upper
-                                or re.search(r'\bDR\b', context_upper)
-                            ):
-                                continue
-                            # Prefer amounts that appear after particulars (Credit column position)
-                            # In bank statements: Date | Particulars | Credit | Balance
-                            # Credit is usually the second-to-last amount, Balance is the last
-                            # Check if there's another amount after this one (likely Balance)
-                            remaining_text = full_line[right_index:]
-                            remaining_amounts = [
-                                amt for amt in re.findall(amount_pattern, remaining_text)
-                                if looks_like_currency(amt)
-                            ]
-                            # If there's another amount after this, and it's larger, this might be Credit
-                            # But if this is the last amount, it might be Balance
-                            if remaining_amounts:
-                                # There's another amount after - this could be Credit
-                                # Note: Large amounts (>50K) will be flagged later, not rejected here
-                                credit = amount_val
-                                break
-                            else:
-                                # This is the last amount - might be Balance, skip it
-                                continue
-                    elif has_comma:
-                        # Has comma thousands separator - likely currency
-                        context_upper = full_line[max(0, amount_pos-30):amount_pos+30].upper()
-                        # Skip if it's clearly in Balance or Debit context
-                        if (
-                            'BALANCE' in context_upper
-                            or 'DEBIT' in context_upper
-                            or re.search(r'\bDR\b', context_upper)
-                        ):
-                            continue
-                        # Check if there's another amount after this
-                        remaining_text = full_line[right_index:]
-                        remaining_amounts = [
-                            amt for amt in re.findall(amount_pattern, remaining_text)
-                            if looks_like_currency(amt)
-                        ]
-                        if remaining_amounts:
-                            # There's another amount after - this could be Credit
-                            # Note: Large amounts (>50K) will be flagged later, not rejected here
-                            if amount_val < 10000:
-                                credit = amount_val
-                                break
-                            # For larger numbers, prefer those with decimals
-                            elif '.' in full_line[max(0, amount_pos-5):amount_pos+5]:
-                                credit = amount_val
-                                break
-                        else:
-                            # This is the last amount - might be Balance, skip it
-                            continue
-            except:
+        # The running balance decides first: when the change in balance is one of the
+        # row's amounts, that amount is the transaction and its sign makes it a credit
+        # or a debit. Rows that break the balance chain fall back to scoring candidates.
+        credit = debit = 0.0
+        balance_amount = balance_chain_amount(amount_tokens, balance_value, prev_balance)
+        balance_verified = balance_amount is not None
+        if balance_verified:
+            if balance_amount > 0:
+                credit = balance_amount / 100
+            else:
+                debit = -balance_amount / 100
+        else:
+            credit = pick_credit_candidate(full_line, amount_matches, amount_tokens, profile)
+            if credit <= 0:
+                log_text_skip(
+                    "missing_credit_value",
+                    line=full_line,
+                    page_number=page_number,
+                    line_index=line_index,
+                    extra={'amounts_found': amounts}
+                )
+                i += 1
                 continue
-        
-        # Skip if no credit amount
-        if credit <= 0:
-            log_text_skip(
-                "missing_credit_value",
-                line=full_line,
-                page_number=page_number,
-                line_index=line_index,
-                extra={'amounts_found': amounts}
-            )
-            i += 1
-            continue
 
-        amount_candidate_value = credit if credit > 0 else amount_candidate_value
-
-        if (
-            balance_value is not None
-            and prev_balance is not None
-            and amount_candidate_value is not None
-        ):
-            balance_delta = round(balance_value - prev_balance, 2)
-            if abs(abs(balance_delta) - amount_candidate_value) <= 0.05:
-                if balance_delta < 0:
-                    log_text_skip(
-                        "debit_row_detected",
-                        line=full_line,
-                        page_number=page_number,
-                        line_index=line_index,
-                        extra={
-                            'balance_delta': balance_delta,
-                            'amount': amount_candidate_value,
-                        }
-                    )
-                    prev_balance = balance_value
-                    i = next_i if next_i > i else i + 1
-                    continue
+            if balance_value is not None and prev_balance is not None:
+                # Off by a few cents from the balance change: still a debit when the balance fell
+                balance_delta = round(balance_value - prev_balance, 2)
+                if balance_delta < 0 and abs(abs(balance_delta) - credit) <= 0.05:
+                    credit, debit = 0.0, credit
         
         # Extract particulars (everything except date and amounts)
         particulars = full_line
         # Remove dates
-        particulars = re.sub(date_pattern, '', particulars)
+        particulars = date_re.sub('', particulars)
         # Remove ALL amounts (but be careful not to remove numbers that are part of particulars like phone numbers)
         # Remove amounts in reverse order to maintain string positions
         for amount in reversed(amounts):
@@ -1419,33 +2380,26 @@ def detect_table_rows(text, page_number=None, initial_balance=None):
                         # Remove this amount from particulars
                         # Use word boundaries to avoid partial matches
                         # Replace with space to maintain word separation
-                        particulars = re.sub(r'\b' + re.escape(amount) + r'\b', '', particulars)
+                        particulars = amount_word_re(amount).sub('', particulars)
             except:
                 pass
         
-        # CRITICAL: Remove footer text from particulars
-        # Footer patterns to remove
-        footer_patterns = [
-            r'Note:.*?presumed to be in order.*?',
-            r'Note:.*?Branch Manager.*?',
-            r'Any omission or errors.*?presumed to be in order.*?',
-            r'MN\d+',  # Footer reference numbers like MN2154520251027123259
-        ]
-        for pattern in footer_patterns:
-            particulars = re.sub(pattern, '', particulars, flags=re.IGNORECASE | re.DOTALL)
+        # CRITICAL: Remove footer text (and footer reference numbers) from particulars
+        for footer_re in profile.footer_strip_res:
+            particulars = footer_re.sub('', particulars)
         
         # Clean up particulars
-        particulars = re.sub(r'\s+', ' ', particulars).strip()
+        particulars = WHITESPACE_RUN_RE.sub(' ', particulars).strip()
         # Remove common header words that might have leaked in
-        particulars = re.sub(r'\b(TRAN DATE|VALUE DATE|PARTICULARS|CREDIT|DEBIT|BALANCE|INSTRUMENT)\b', '', particulars, flags=re.IGNORECASE)
+        particulars = profile.column_titles_re.sub('', particulars)
         # Remove any remaining standalone amounts (numbers with commas/decimals that might have been missed)
         # Pattern: numbers with commas or decimals that are standalone (not part of phone/transaction codes)
-        particulars = re.sub(r'\b[\d,]+\.\d{2}\b', '', particulars)  # Remove amounts like "2,000.00" or "490,441.00"
-        particulars = re.sub(r'\b[\d,]{4,}\.\d{0,2}\b', '', particulars)  # Remove large numbers with decimals (like "490441.00")
-        particulars = re.sub(r'\s+', ' ', particulars).strip()
+        for stray_amount_re in STRAY_AMOUNT_RES:
+            particulars = stray_amount_re.sub('', particulars)
+        particulars = WHITESPACE_RUN_RE.sub(' ', particulars).strip()
         
         # CRITICAL: Final check - skip if particulars contains "Grand Total"
-        if "GRAND TOTAL" in particulars.upper():
+        if profile.grand_total_anchor in particulars.upper():
             log_text_skip(
                 "grand_total_in_particulars_text",
                 line=full_line,
@@ -1458,19 +2412,14 @@ def detect_table_rows(text, page_number=None, initial_balance=None):
         
         # CRITICAL: Comprehensive footer/summary check (same as table parser)
         particulars_upper = particulars.upper()
-        footer_indicators = [
-            "END OF STATEMENT", "SUMMARY", "OPENING BALANCE", "CLOSING BALANCE",
-            "TOTAL DEBITS", "TOTAL CREDITS", "IMPORTANT NOTICE", "PLEASE EXAMINE",
-            "GRAND TOTAL", "BROUGHT FORWARD", "CARRIED FORWARD", "BALANCE B/F", "BALANCE C/F"
-        ]
-        footer_found_count = sum(1 for keyword in footer_indicators if keyword in particulars_upper)
-        has_dash_separator = bool(re.search(r'-{3,}', particulars))  # 3+ consecutive dashes
+        particulars_hits = scan_keywords(particulars_upper)
+        footer_found_count = particulars_hits['closing']
+        has_dash_separator = bool(DASH_RUN_RE.search(particulars))  # 3+ consecutive dashes
         
         # Skip if we find 2+ footer keywords OR dash + footer keyword OR specific critical keywords
         if footer_found_count >= 2 or \
            (has_dash_separator and footer_found_count >= 1) or \
-           any(keyword in particulars_upper for keyword in 
-               ["END OF STATEMENT", "IMPORTANT NOTICE", "PLEASE EXAMINE YOUR STATEMENT"]):
+           particulars_hits['closing_anchor']:
             log_text_skip(
                 "footer_text_in_final_particulars_text",
                 line=full_line,
@@ -1483,10 +2432,10 @@ def detect_table_rows(text, page_number=None, initial_balance=None):
             i += 1
             continue
         
-        # CRITICAL: Detect implausibly large amounts with balance context (text parser)
-        if credit > 500000:
-            balance_context_keywords = ["BALANCE", "CLOSING", "OPENING", "SUMMARY", "TOTAL", "B/F", "C/F"]
-            if any(keyword in particulars_upper for keyword in balance_context_keywords):
+        # CRITICAL: Detect implausibly large amounts with balance context (text parser);
+        # an amount the balance chain confirmed is not a misread balance
+        if not balance_verified and credit > profile.implausible_credit:
+            if particulars_hits['balance_context']:
                 log_text_skip(
                     "implausibly_large_amount_text",
                     line=full_line,
@@ -1499,7 +2448,7 @@ def detect_table_rows(text, page_number=None, initial_balance=None):
                 continue
         
         # Skip if particulars is too short or looks like a header
-        if len(particulars) < 3 or particulars.upper() in ["TRAN DATE", "VALUE DATE", "PARTICULARS"]:
+        if len(particulars) < 3 or particulars.upper() in profile.particulars_titles:
             log_text_skip(
                 "particulars_too_short",
                 line=full_line,
@@ -1515,18 +2464,27 @@ def detect_table_rows(text, page_number=None, initial_balance=None):
             # Extract transaction code from particulars
             transaction_code = extract_transaction_code(particulars)
             
-            transactions.append({
-                'tran_date': tran_date,
-                'value_date': tran_date,
-                'particulars': particulars,
-                'credit': credit,
-                'debit': 0.0,
-                'balance': balance_value,
-                'transaction_code': transaction_code,
-                'page_number': page_number,
-                'row_index': line_index,
-                'source': 'text'
-            })
+            try:
+                transactions.append(Transaction.parsed(
+                    tran_date=tran_date,
+                    particulars=particulars,
+                    credit=credit,
+                    debit=debit,
+                    balance=balance_value,
+                    transaction_code=transaction_code,
+                    page_number=page_number,
+                    row_index=line_index,
+                    source='text',
+                ))
+            except ValueError:
+                # A date that is not a calendar ISO date costs this row, not the page
+                log_text_skip(
+                    "unreadable_date_text",
+                    line=full_line,
+                    page_number=page_number,
+                    line_index=line_index,
+                    extra={'tran_date': tran_date}
+                )
         
         prev_balance = balance_value if balance_value is not None else prev_balance
         i = next_i if next_i > i else i + 1
@@ -1534,27 +2492,369 @@ def detect_table_rows(text, page_number=None, initial_balance=None):
     return transactions, prev_balance
 
 
-def parse_date(date_str):
-    """Parse date string to ISO format"""
-    if not date_str:
+def classify_column_header(header_text, profile):
+    """Map a column's header label to the role the words engine needs (the profile's ``word_columns``)"""
+    upper = header_text.upper()
+    if not upper:
         return None
-    
-    date_str = date_str.strip()
-    
-    # Common date formats
-    formats = [
-        '%d/%m/%Y',
-        '%d-%m-%Y',
-        '%Y-%m-%d',
-        '%d/%m/%y',
-        '%d-%m-%y',
-        '%Y/%m/%d',
+    return profile.word_column_role(upper) or 'other'
+
+
+def find_column_header(words, profile):
+    """Locate the transaction table header on a page of words.
+
+    Returns ``(header_words, body_top)`` or ``(None, None)`` when the page has
+    no row carrying one of the profile's ``column_header_anchors``.
+    """
+    anchors = [w for w in words if w[4].upper() in profile.column_header_anchors]
+    if not anchors:
+        return None, None
+    anchor_top = min(w[2] for w in anchors)
+    header_words = [w for w in words if abs(w[2] - anchor_top) <= COLUMN_HEADER_SPAN]
+    body_top = max(w[3] for w in header_words)
+    return header_words, body_top
+
+
+def find_body_bottom(words, body_top, profile):
+    """Top of the first footer line (one of the profile's ``word_footer_anchors``) below the header, or +inf"""
+    bottom = float('inf')
+    for word in words:
+        if word[2] <= body_top:
+            continue
+        upper = word[4].upper()
+        if upper.startswith(profile.word_footer_anchors) and word[2] < bottom:
+            bottom = word[2]
+    return bottom
+
+
+def build_column_template(words, header_words, body_top, body_bottom, profile):
+    """Derive column bands from a histogram of word x-coverage.
+
+    Every body word adds one to the coverage of the x-range it spans; runs of
+    x where coverage stays at or below a small tolerance are the gutters
+    between columns. Header labels always count as covered, so a column with
+    no data on this page still gets a band, and so do the word spaces inside
+    a label (up to ``COLUMN_LABEL_GAP``), so a page with one transaction line
+    doesn't split "Tran Date" into two columns. Returns a template dict with band
+    ``separators`` (x positions) and per-band ``roles``, or None when the
+    bands don't include a date and an amount column.
+    """
+    body = [w for w in words if body_top < w[2] < body_bottom]
+    if not body:
+        return None
+
+    width = int(max(w[1] for w in body + header_words)) + 2
+    x0 = np.array([w[0] for w in body])
+    x1 = np.array([w[1] for w in body])
+    coverage = np.zeros(width + 1, dtype=np.int32)
+    np.add.at(coverage, np.floor(x0).astype(int), 1)
+    np.add.at(coverage, np.ceil(x1).astype(int), -1)
+    coverage = np.cumsum(coverage)[:width]
+
+    # Header words, plus the spaces between neighbouring words of one label line
+    header_spans = [(w[0], w[1]) for w in header_words]
+    by_line = sorted(header_words, key=lambda w: (round(w[2]), w[0]))
+    for left, right in zip(by_line, by_line[1:]):
+        if round(left[2]) == round(right[2]) and 0 < right[0] - left[1] <= COLUMN_LABEL_GAP:
+            header_spans.append((left[1], right[0]))
+    header_coverage = np.zeros(width + 1, dtype=np.int32)
+    np.add.at(header_coverage, np.floor([span[0] for span in header_spans]).astype(int), 1)
+    np.add.at(header_coverage, np.ceil([span[1] for span in header_spans]).astype(int), -1)
+    header_coverage = np.cumsum(header_coverage)[:width]
+
+    # A few over-long particulars spilling into the next column must not bridge the gutter
+    line_count = len(np.unique(np.round([w[2] for w in body])))
+    tolerance = max(1, int(line_count * COLUMN_OVERFLOW_RATIO))
+    covered = (coverage > tolerance) | (header_coverage > 0)
+
+    # Band boundaries are where `covered` flips
+    flips = np.flatnonzero(np.diff(covered.astype(np.int8)))
+    edges = np.concatenate(([0], flips + 1, [width]))
+    bands = [
+        (int(start), int(end))
+        for start, end in zip(edges[:-1], edges[1:])
+        if covered[start]
     ]
-    
+    if len(bands) < 2:
+        return None
+
+    separators = [(bands[i][1] + bands[i + 1][0]) / 2.0 for i in range(len(bands) - 1)]
+    header_band = np.searchsorted(separators, [(w[0] + w[1]) / 2.0 for w in header_words])
+    labels = [[] for _ in bands]
+    for word, band_index in sorted(zip(header_words, header_band), key=lambda item: (item[0][2], item[0][0])):
+        labels[band_index].append(word[4])
+    roles = [classify_column_header(' '.join(label), profile) for label in labels]
+
+    if 'tran_date' not in roles or not ({'credit', 'debit'} & set(roles)):
+        return None
+
+    return {
+        'separators': separators,
+        'roles': roles,
+        'headers': [' '.join(label) for label in labels],
+    }
+
+
+def words_to_cell_rows(page_data, template=None):
+    """Rebuild a page's transaction grid from word boxes and column bands.
+
+    Each word is assigned to a column band in one vectorised pass
+    (``np.searchsorted`` on the band separators). Rows are delimited by the
+    page's horizontal rules when every transaction sits between two of them
+    (ruled layouts centre multi-line cells on the dated line), otherwise by
+    dated lines with continuation lines hanging below. Returns
+    ``(rows, template)``: one list of cell strings (one per band) for each
+    dated row, and the template to reuse for later pages.
+    """
+    page_number = page_data.get('page_number')
+    words = page_data.get('words') or []
+    if not words:
+        return [], template
+
+    profile = bank_profile_for(page_data.get('statement_format'))
+    header_words, body_top = find_column_header(words, profile)
+    if body_top is None:
+        body_top = 0.0
+    body_bottom = find_body_bottom(words, body_top, profile)
+
+    if template is None and header_words:
+        template = build_column_template(words, header_words, body_top, body_bottom, profile)
+        if template is not None:
+            debug_log(f"[WORDS] column template from page {page_number}: "
+                      f"{list(zip(template['headers'], template['roles']))}")
+    if template is None:
+        return [], template
+
+    body = [w for w in words if body_top < w[2] < body_bottom]
+    if not body:
+        return [], template
+
+    roles = template['roles']
+    centers_x = np.array([(w[0] + w[1]) / 2.0 for w in body])
+    tops = np.array([w[2] for w in body])
+    centers_y = np.array([(w[2] + w[3]) / 2.0 for w in body])
+    word_band = np.searchsorted(template['separators'], centers_x)
+
+    # Dated lines: a full date in the transaction date column
+    date_band = roles.index('tran_date')
+    anchor_tops = sorted({
+        round(float(tops[i]), 1)
+        for i in np.flatnonzero(word_band == date_band)
+        if profile.date_re.fullmatch(body[i][4])
+    })
+    if not anchor_tops:
+        return [], template
+
+    rules = sorted(y for y in page_data.get('rules', []) if body_top < y < body_bottom)
+    inner_rules = [y for y in rules if anchor_tops[0] < y < anchor_tops[-1]]
+    if len(anchor_tops) > 1 and len(inner_rules) >= len(anchor_tops) - 1:
+        # Ruled layout: rows are the bands between horizontal rules
+        word_row = np.searchsorted(rules, centers_y)
+        anchor_rows = np.searchsorted(rules, np.array(anchor_tops) + 1.0)
+    else:
+        # Top-aligned layout: a row runs from its dated line to the next one
+        word_row = np.searchsorted(anchor_tops, tops + 1.0, side='right') - 1
+        anchor_rows = np.arange(len(anchor_tops))
+
+    cells = {}
+    order = np.lexsort((centers_x, tops))
+    for i in order:
+        key = (int(word_row[i]), int(word_band[i]))
+        cells.setdefault(key, []).append(body[i][4])
+
+    rows = [
+        [' '.join(cells.get((row, band_index), [])) for band_index in range(len(roles))]
+        for row in sorted(set(int(r) for r in anchor_rows))
+    ]
+    return rows, template
+
+
+def parse_bank_words(page_data, template=None):
+    """Words engine: parse a bank page from word coordinates and column bands.
+
+    The page is turned into a grid by ``words_to_cell_rows`` and each row's
+    cells are read by the role of their column. Returns
+    ``(transactions, template)``; the template is reused for later pages.
+    """
+    page_number = page_data.get('page_number')
+    profile = bank_profile_for(page_data.get('statement_format'))
+    transactions = []
+    rows, template = words_to_cell_rows(page_data, template)
+    if not rows:
+        return transactions, template
+
+    roles = template['roles']
+    for row_index, row in enumerate(rows):
+        row_cells = {}
+        for role, text in zip(roles, row):
+            if role and text:
+                row_cells[role] = (row_cells[role] + ' ' + text) if role in row_cells else text
+
+        date_match = profile.date_re.search(row_cells.get('tran_date', ''))
+        tran_date = parse_date(date_match.group(), profile.date_formats) if date_match else None
+        if not tran_date:
+            log_text_skip("words_unparsable_date", line=str(row_cells), page_number=page_number, line_index=row_index)
+            continue
+
+        credit = parse_word_amount(row_cells.get('credit'))
+        debit = parse_word_amount(row_cells.get('debit'))
+        balance = parse_word_amount(row_cells.get('balance'))
+        if not credit and not debit:
+            log_text_skip("words_missing_amount", line=str(row_cells), page_number=page_number, line_index=row_index)
+            continue
+
+        particulars = ' '.join(
+            row_cells[role] for role in ('particulars', 'instrument') if row_cells.get(role)
+        ).strip()
+        if not particulars or profile.grand_total_anchor in particulars.upper():
+            log_text_skip("words_no_particulars", line=str(row_cells), page_number=page_number, line_index=row_index)
+            continue
+        if len(particulars) > 1000:
+            particulars = particulars[:1000]
+
+        try:
+            transactions.append(Transaction.parsed(
+                tran_date=tran_date,
+                particulars=particulars,
+                credit=credit or 0.0,
+                debit=debit or 0.0,
+                balance=balance,
+                transaction_code=extract_transaction_code(particulars),
+                page_number=page_number,
+                row_index=row_index,
+                source='words',
+            ))
+        except ValueError:
+            log_text_skip("words_unreadable_date", line=str(row_cells), page_number=page_number, line_index=row_index)
+
+    return transactions, template
+
+
+def parse_word_amount(cell):
+    """Parse a column cell as an amount, tolerating stray tokens around it"""
+    if not cell:
+        return None
+    amount = parse_amount(cell)
+    if amount is None:
+        for token in reversed(cell.split()):
+            amount = parse_amount(token)
+            if amount is not None:
+                break
+    return amount
+
+
+# Date formats tried when the caller has no bank profile's formats
+DATE_FORMATS = (
+    '%d/%m/%Y',
+    '%d-%m-%Y',
+    '%Y-%m-%d',
+    '%d/%m/%y',
+    '%d-%m-%y',
+    '%Y/%m/%d',
+)
+
+
+# Distinct date strings remembered by parse_date; a statement repeats a few hundred of them
+DATE_MEMO_SIZE = 4096
+
+# Date strings sampled from the start of a statement to infer its date format
+DATE_SAMPLE_SIZE = 40
+
+# strptime's own patterns for the directives date formats use, so a compiled
+# format accepts exactly the strings strptime would
+DATE_DIRECTIVE_PATTERNS = {
+    '%d': r'(?P<day>3[01]|[12]\d|0[1-9]|[1-9]| [1-9])',
+    '%m': r'(?P<month>1[0-2]|0[1-9]|[1-9])',
+    '%Y': r'(?P<year>\d\d\d\d)',
+    '%y': r'(?P<short_year>\d\d)',
+}
+
+# New date strings parse_date resolved through the statement's inferred format
+# ('fast') or by searching every format ('fallback'); repeats come from the memo
+DATE_PARSE_COUNTS = {'fast': 0, 'fallback': 0}
+
+# (formats, compiled inferred format, compiled formats tried before it) for the statement being parsed
+_date_fast_path = None
+
+
+def compile_date_format(fmt):
+    """Regex matching exactly the strings ``strptime`` accepts for ``fmt``, None for unsupported directives"""
+    pattern = []
+    for token in re.split(r'(%.)', fmt):
+        if token.startswith('%'):
+            if token not in DATE_DIRECTIVE_PATTERNS:
+                return None
+            pattern.append(DATE_DIRECTIVE_PATTERNS[token])
+        elif token:
+            pattern.append(re.escape(token))
+    return re.compile(''.join(pattern))
+
+
+def infer_date_format(samples, formats=DATE_FORMATS):
+    """The format in ``formats`` that parses the most sample date strings (the earliest on ties), or None"""
+    best_format, best_count = None, 0
+    for fmt in formats:
+        count = 0
+        for sample in samples:
+            try:
+                datetime.strptime(sample.strip(), fmt)
+                count += 1
+            except ValueError:
+                continue
+        if count > best_count:
+            best_format, best_count = fmt, count
+    return best_format
+
+
+def use_date_format(fmt, formats=DATE_FORMATS):
+    """Make ``fmt`` parse_date's fast path for calls with ``formats``; None switches it off.
+
+    A string the compiled format matches is converted directly, unless a format
+    listed before ``fmt`` could also match it - those, and everything the fast
+    path rejects, go through the full ordered search, so results don't change.
+    """
+    global _date_fast_path
+    _date_fast_path = None
+    if fmt is None or fmt not in formats:
+        return
+    earlier = [compile_date_format(other) for other in formats[:formats.index(fmt)]]
+    compiled = compile_date_format(fmt)
+    if compiled is None or None in earlier:
+        return
+    _date_fast_path = (tuple(formats), compiled, earlier)
+
+
+def sample_date_strings(text, profile):
+    """Distinct date strings from the start of a statement page's text, for ``infer_date_format``"""
+    samples = []
+    for match in profile.date_re.finditer(text or ""):
+        if match.group() not in samples:
+            samples.append(match.group())
+            if len(samples) >= DATE_SAMPLE_SIZE:
+                break
+    return samples
+
+
+def infer_page_date_format(page_data):
+    """Infer the statement's date format from a bank page and make it parse_date's fast path"""
+    profile = bank_profile_for(page_data.get('statement_format'))
+    fmt = infer_date_format(sample_date_strings(page_data.get('text'), profile), profile.date_formats)
+    if fmt is not None:
+        use_date_format(fmt, profile.date_formats)
+        debug_log(f"[DATES] inferred {fmt} from page {page_data.get('page_number')}")
+    return fmt
+
+
+def search_date_formats(date_str, formats):
+    """Parse date string to ISO format, trying ``formats`` in order.
+
+    Dates are zero-padded ``YYYY-MM-DD`` (``strftime`` leaves years before 1000
+    unpadded on Linux); years ``datetime`` can't hold give None.
+    """
     for fmt in formats:
         try:
             dt = datetime.strptime(date_str, fmt)
-            return dt.strftime('%Y-%m-%d')
+            return dt.date().isoformat()
         except:
             continue
     
@@ -1566,63 +2866,261 @@ def parse_date(date_str):
             year = '20' + year
         try:
             dt = datetime(int(year), int(month), int(day))
-            return dt.strftime('%Y-%m-%d')
+            return dt.date().isoformat()
         except:
             pass
     
     return None
 
 
-def parse_amount(amount_str):
-    """Parse amount string to float, preserving decimal places (.00 for cents)"""
-    if not amount_str:
-        return None
-    
-    amount_str = str(amount_str).strip()
-    
-    # Reject if it looks like a date (contains date patterns)
-    if re.search(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}', amount_str):
+@lru_cache(maxsize=DATE_MEMO_SIZE)
+def _parse_date_memo(date_str, formats):
+    fast_path = _date_fast_path
+    if fast_path is not None and fast_path[0] == formats:
+        _, compiled, earlier = fast_path
+        match = compiled.match(date_str)
+        if match and match.end() == len(date_str) and not any(pattern.fullmatch(date_str) for pattern in earlier):
+            fields = match.groupdict()
+            if 'year' in fields:
+                year = int(fields['year'])
+            else:
+                # strptime's %y pivot
+                year = int(fields['short_year'])
+                year += 2000 if year <= 68 else 1900
+            try:
+                parsed = datetime(year, int(fields['month']), int(fields['day'])).date().isoformat()
+            except ValueError:
+                parsed = None
+            if parsed is not None:
+                DATE_PARSE_COUNTS['fast'] += 1
+                return parsed
+    DATE_PARSE_COUNTS['fallback'] += 1
+    return search_date_formats(date_str, formats)
+
+
+def parse_date(date_str, formats=DATE_FORMATS):
+    """Parse date string to ISO format, as the first of ``formats`` that accepts it would.
+
+    Results are memoized per distinct string; new strings try the statement's
+    inferred format first (see ``use_date_format``).
+    """
+    if not date_str:
         return None
-    
-    # Reject if it's too long (likely not an amount)
-    if len(amount_str) > 25:
+    return _parse_date_memo(date_str.strip(), tuple(formats))
+
+
+# Token kinds reported by scan_amount_token
+TOKEN_CURRENCY = 'currency'  # printed like money: "12,001.00", "450.00", "12,001"
+TOKEN_NUMBER = 'number'      # other bare numbers: "450", "12.5", "12."
+TOKEN_PHONE = 'phone'        # 9-12 bare digits, e.g. "254712345678"
+TOKEN_DATE = 'date'          # contains a day/month/year date
+TOKEN_TEXT = 'text'          # anything else: codes, words, symbols around digits
+
+# Tokens that are not bare numbers are searched for a date (parse_amount rejects those)
+DATE_IN_TOKEN_RE = re.compile(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}')
+
+# parse_amount rejects anything over one billion, and strings too long to be an amount
+MAX_AMOUNT_CENTS = 100000000000
+MAX_AMOUNT_LENGTH = 25
+
+
+def scan_amount_token(token):
+    """Classify a stripped token and read its value in a single pass.
+
+    Returns ``(kind, cents)``: one of the ``TOKEN_*`` kinds and the integer
+    cents of the number the token spells, or None when it is not a bare
+    number with at most two decimals (dates and text always give None).
+    """
+    # A bare number is digits and thousands commas with an optional decimal part;
+    # str.isdecimal() accepts exactly the characters the old \d patterns did
+    whole, point, fraction = token.partition('.')
+    digits = whole.replace(',', '') if ',' in whole else whole
+    if digits.isdecimal() and (fraction.isdecimal() or not fraction):
+        if len(fraction) > 2:
+            return TOKEN_TEXT, None
+        cents = int(digits + (fraction + '00')[:2])
+        if point:
+            return (TOKEN_CURRENCY if len(fraction) == 2 else TOKEN_NUMBER), cents
+        if whole is not digits:
+            return TOKEN_CURRENCY, cents
+        if 9 <= len(digits) <= 12:
+            return TOKEN_PHONE, cents
+        return TOKEN_NUMBER, cents
+    if DATE_IN_TOKEN_RE.search(token):
+        return TOKEN_DATE, None
+    return TOKEN_TEXT, None
+
+
+def salvage_amount_cents(amount_str):
+    """Cents from a token with currency symbols or stray characters around its digits, or None"""
+    # Handle formats like: "KES 12,001.00", "12 001.00", "Ksh12001"
+    cleaned = re.sub(r'[^\d.]', '', amount_str.replace(',', '').replace(' ', ''))
+    match = re.match(r'^(\d+)\.?(\d{0,2})$', cleaned)
+    if not match:
         return None
-    
-    # Remove currency symbols and thousand separators (commas), but keep decimal point
-    # Handle formats like: "12,001.00", "12001.00", "12,001", "12001"
-    cleaned = amount_str.replace(',', '').replace(' ', '')
-    
-    # Remove any currency symbols but keep digits and decimal point
-    cleaned = re.sub(r'[^\d.]', '', cleaned)
-    
-    # Must have at least one digit
-    if not cleaned or not re.search(r'\d', cleaned):
+    return int(match.group(1)) * 100 + int(match.group(2).ljust(2, '0'))
+
+
+def amount_cents(amount_str):
+    """Parse amount string to integer cents; None for dates, non-amounts, zero and anything over one billion"""
+    if not amount_str:
         return None
-    
-    # Validate format - should be digits with optional decimal point and 0-2 decimal places
-    if not re.match(r'^\d+\.?\d{0,2}$', cleaned):
+
+    amount_str = str(amount_str).strip()
+    kind, cents = scan_amount_token(amount_str)
+    if kind == TOKEN_DATE or len(amount_str) > MAX_AMOUNT_LENGTH:
         return None
-    
-    try:
-        value = float(cleaned)
-        
-        # Reject if value is too large (max for decimal(15,2) is 999999999999999.99)
-        # But we'll be more conservative - reject anything over 1 billion
-        if value > 1000000000:
-            return None
-        
-        # Reject negative values (we only want credits)
-        if value < 0:
-            return None
-        
-        # Reject zero
-        if value == 0:
-            return None
-        
-        # Round to 2 decimal places to preserve .00 format
-        return round(value, 2)
-    except:
+    if kind == TOKEN_TEXT:
+        cents = salvage_amount_cents(amount_str)
+    if not cents or cents > MAX_AMOUNT_CENTS:
         return None
+    return cents
+
+
+def parse_amount(amount_str):
+    """Parse amount string to float, preserving decimal places (.00 for cents)"""
+    cents = amount_cents(amount_str)
+    return cents / 100 if cents is not None else None
+
+
+def amount_string(value):
+    """Exact decimal string for a float amount (strings pass through), None for None"""
+    if value is None or isinstance(value, str):
+        return value
+    return format_cents(to_cents(value))
+
+
+def transactions_for_json(transactions):
+    """The transaction records as output dicts, amounts as exact decimal strings"""
+    return [transaction.as_dict() for transaction in transactions]
+
+
+def write_ndjson(f, records):
+    """Write records as compact JSON lines and flush, so a reader tailing ``f`` sees them at once"""
+    for record in records:
+        f.write(json.dumps(record, separators=(',', ':')))
+        f.write('\n')
+    f.flush()
+
+
+def ndjson_summary(stats, transaction_count, complete):
+    """The trailing ``--format ndjson`` record; ``complete`` is False when parsing failed after rows went out"""
+    return {'summary': {
+        'transactions': transaction_count,
+        'complete': complete,
+        'pages': stats.get('pages', 0),
+        'is_paybill': stats.get('is_paybill', False),
+        'statement_format': stats.get('statement_format', FORMAT_UNKNOWN),
+        'bank_path': stats.get('bank_path'),
+        'ocr_pages': stats.get('ocr_pages', 0),
+    }}
+
+
+# Cells the column parsers decode directly; anything else goes through
+# parse_amount / parse_date one distinct value at a time. Both shapes give
+# exactly what the per-cell parsers would: a plain amount has no separators
+# to clean, and a day-month-year prefix with a four-digit year is read the
+# same way by every strptime format and by parse_date's regex fallback.
+PLAIN_AMOUNT_RE = re.compile(r'(\d{1,12})(?:\.(\d{0,2}))?$')
+DMY_PREFIX_RE = re.compile(r'(\d{1,2})[/-](\d{1,2})[/-]([1-9]\d{3})')
+
+
+def column_strings(cells):
+    """Stripped string form of each cell, '' for empty cells"""
+    return [str(cell).strip() if cell else "" for cell in cells]
+
+
+def parse_amount_column(cells):
+    """Parse a column of amount cells at once, as ``parse_amount`` would cell by cell.
+
+    Returns ``(cents, valid)``: an int64 array of each amount in cents and a
+    boolean mask of the cells ``parse_amount`` accepts. Needs numpy.
+    """
+    strings = column_strings(cells)
+    cents = np.zeros(len(strings), dtype=np.int64)
+    valid = np.zeros(len(strings), dtype=bool)
+
+    plain_rows, whole_parts, fraction_parts = [], [], []
+    other_rows = {}
+    for row, text in enumerate(strings):
+        if not text:
+            continue
+        match = PLAIN_AMOUNT_RE.match(text)
+        if match:
+            plain_rows.append(row)
+            whole_parts.append(match.group(1))
+            fraction_parts.append((match.group(2) or '').ljust(2, '0'))
+        else:
+            other_rows.setdefault(text, []).append(row)
+
+    if plain_rows:
+        plain_cents = np.array(whole_parts).astype(np.int64) * 100 + np.array(fraction_parts).astype(np.int64)
+        rows = np.array(plain_rows)
+        cents[rows] = plain_cents
+        # parse_amount rejects zero and anything above one billion
+        valid[rows] = (plain_cents > 0) & (plain_cents <= MAX_AMOUNT_CENTS)
+
+    for text, rows in other_rows.items():
+        amount = amount_cents(text)
+        if amount is not None:
+            cents[rows] = amount
+            valid[rows] = True
+    return cents, valid
+
+
+def parse_date_column(cells):
+    """Parse a column of date cells at once, as ``parse_date`` would cell by cell.
+
+    Returns ``(dates, valid)``: a datetime64[D] array and a boolean mask of
+    the cells ``parse_date`` accepts. Needs numpy.
+    """
+    strings = column_strings(cells)
+    days = np.zeros(len(strings), dtype=np.int64)
+    valid = np.zeros(len(strings), dtype=bool)
+
+    dmy_rows, dmy_parts = [], []
+    other_rows = {}
+    for row, text in enumerate(strings):
+        if not text:
+            continue
+        match = DMY_PREFIX_RE.match(text)
+        if match:
+            dmy_rows.append(row)
+            dmy_parts.append(match.groups())
+        else:
+            other_rows.setdefault(text, []).append(row)
+
+    if dmy_rows:
+        day, month, year = np.array(dmy_parts).astype(np.int64).T
+        month_ok = (month >= 1) & (month <= 12)
+        months = ((year - 1970) * 12 + np.clip(month, 1, 12) - 1).astype('datetime64[M]')
+        month_days = ((months + 1).astype('datetime64[D]') - months.astype('datetime64[D]')).astype(np.int64)
+        rows = np.array(dmy_rows)
+        days[rows] = (months.astype('datetime64[D]') - np.datetime64(0, 'D')).astype(np.int64) + day - 1
+        valid[rows] = month_ok & (day >= 1) & (day <= month_days)
+
+    for text, rows in other_rows.items():
+        parsed = parse_date(text)
+        if parsed is not None:
+            days[rows] = (np.datetime64(parsed, 'D') - np.datetime64(0, 'D')).astype(np.int64)
+            valid[rows] = True
+    return days.astype('datetime64[D]'), valid
+
+
+def amount_column_values(cells):
+    """``parse_amount`` of every cell in a column, parsed as one batch when numpy is available"""
+    if not NUMPY_AVAILABLE:
+        return [parse_amount(cell) for cell in column_strings(cells)]
+    cents, valid = parse_amount_column(cells)
+    return [value / 100 if ok else None for value, ok in zip(cents.tolist(), valid.tolist())]
+
+
+def date_column_values(cells):
+    """``parse_date`` of every cell in a column, parsed as one batch when numpy is available"""
+    if not NUMPY_AVAILABLE:
+        return [parse_date(cell) for cell in column_strings(cells)]
+    dates, valid = parse_date_column(cells)
+    return [value if ok else None for value, ok in zip(np.datetime_as_string(dates).tolist(), valid.tolist())]
 
 
 def extract_transaction_code(particulars):
@@ -1676,126 +3174,779 @@ def extract_transaction_code(particulars):
     return None
 
 
+def parse_bank_page(page_data, initial_balance=None, parse_text=True, parse_tables=True):
+    """Run the text and table parsers over one extracted bank statement page.
+
+    Returns ``(text_transactions, table_transactions, last_balance)`` so the
+    running balance can be carried into the next page. Once a statement has
+    committed to one path the other parser is switched off. Both parsers run
+    the rules of the bank profile matching the page's statement format.
+    """
+    page_number = page_data.get('page_number')
+    profile = bank_profile_for(page_data.get('statement_format'))
+    text_transactions = []
+    table_transactions = []
+    last_balance = initial_balance
+
+    page_text = page_data.get('text') or ""
+    if parse_text and page_text and len(page_text) > 50:
+        text_transactions, last_balance = detect_table_rows(
+            page_text,
+            page_number=page_number,
+            initial_balance=initial_balance,
+            profile=profile,
+            first_line_index=page_data.get('line_offset', 0),
+        )
+
+    tables = page_data.get('tables', []) if parse_tables else []
+    for table_index, table in enumerate(tables):
+        if isinstance(table, dict):
+            rows = table.get('rows') or []
+            header_row = table.get('header')
+            table_page = table.get('page_number', page_number)
+        else:
+            rows = table or []
+            header_row = table[0] if table else None
+            table_page = page_number
+
+        if not rows:
+            continue
+
+        table_transactions.extend(
+            parse_bank_table(
+                rows,
+                header_row,
+                page_number=table_page,
+                table_index=table_index,
+                profile=profile,
+            )
+        )
+
+    return text_transactions, table_transactions, last_balance
+
+
+def table_transactions_complete(table_transactions):
+    """Check that the table parser recovered full particulars (not split/---- cells)"""
+    return all(
+        len(t.particulars) > 15 and not t.particulars.startswith('---')
+        for t in table_transactions[:10]
+    )
+
+
+def choose_bank_path(text_transactions, table_transactions):
+    """Score the text and table parsers on a page sample.
+
+    Returns ``'text'`` or ``'table'`` when one parser clearly wins, ``'dual'``
+    when both produced rows and neither wins (the merge in
+    ``select_bank_transactions`` is needed), or None when the sample had no
+    transactions at all and more pages should be looked at.
+    """
+    if not text_transactions and not table_transactions:
+        return None
+    if not table_transactions:
+        return BANK_PATH_TEXT
+    if not text_transactions:
+        return BANK_PATH_TABLE
+    if table_transactions_complete(table_transactions) and len(table_transactions) > len(text_transactions):
+        return BANK_PATH_TABLE
+    return BANK_PATH_DUAL
+
+
+def select_bank_transactions(text_transactions, table_transactions):
+    """Pick (or merge) the text-parser and table-parser results for a bank statement"""
+    transactions = list(text_transactions)
+
+    if table_transactions:
+        table_has_complete = table_transactions_complete(table_transactions)
+
+        if table_has_complete and len(table_transactions) > len(text_transactions):
+            transactions = table_transactions
+        elif not text_transactions:
+            transactions = table_transactions
+        else:
+            seen_keys = {t.dedup_key() for t in transactions}
+            for entry in table_transactions:
+                key = entry.dedup_key()
+                if key not in seen_keys:
+                    transactions.append(entry)
+                    seen_keys.add(key)
+
+    return transactions
+
+
+def parse_page_ranges(spec, page_count):
+    """Expand a ``--pages`` spec such as ``120-240``, ``5``, ``300-`` or ``1-10,40-50``.
+
+    Returns the sorted 1-based page numbers; raises ValueError for malformed
+    or out-of-range specs.
+    """
+    page_numbers = set()
+    for part in spec.split(','):
+        part = part.strip()
+        match = re.fullmatch(r'(\d+)(?:\s*-\s*(\d*))?', part)
+        if not match:
+            raise ValueError(f"invalid page range '{part}'")
+        start = int(match.group(1))
+        if match.group(2) is None:
+            end = start
+        else:
+            end = int(match.group(2)) if match.group(2) else page_count
+        if start < 1 or end < start or end > page_count:
+            raise ValueError(f"page range '{part}' is outside 1-{page_count}")
+        page_numbers.update(range(start, end + 1))
+    return sorted(page_numbers)
+
+
+def carried_balance_before(pdf_path, page_number):
+    """Running balance at the end of ``page_number - 1``, for a range starting mid-statement.
+
+    The text parser tells credits from debits by the change in balance, so the
+    first rows of a range would otherwise be classified without a previous
+    balance. Only that one preceding page is extracted and parsed.
+    """
+    if page_number <= 1:
+        return None
+    for page_data in iter_pdf_pages(pdf_path, page_numbers=[page_number - 1],
+                                    extraction_plan={'text': True, 'tables': False}):
+        if page_data['is_paybill']:
+            return None
+        _, _, last_balance = parse_bank_page(page_data, parse_tables=False)
+        return last_balance
+    return None
+
+
+@lru_cache(maxsize=1)
+def bank_profiles_hash():
+    """Hash of the bank profile files: their fingerprints and crop anchors decide what is extracted"""
+    return make_key(*(
+        hash_file(os.path.join(PROFILE_DIR, name))
+        for name in sorted(os.listdir(PROFILE_DIR)) if name.endswith('.json')
+    ))
+
+
+@lru_cache(maxsize=1)
+def parser_source_hash():
+    """Hash of the parser modules and bank profile files, so a checkpoint is only resumed by the code that wrote it"""
+    module_dir = os.path.dirname(os.path.abspath(__file__))
+    return make_key(*(hash_file(os.path.join(module_dir, name)) for name in PARSER_SOURCES), bank_profiles_hash())
+
+
+def checkpoint_path_for(checkpoint_dir, pdf_path, bank_engine, pages_spec):
+    """Checkpoint file for one PDF/engine/page-range combination, parsed by this version of the parser"""
+    key = make_key(
+        'checkpoint', EXTRACTOR_VERSION, CHECKPOINT_FORMAT, parser_source_hash(),
+        hash_file(pdf_path), bank_engine, pages_spec or '',
+    )
+    return os.path.join(checkpoint_dir, key + '.json')
+
+
+def prune_checkpoints(checkpoint_dir, max_age=CHECKPOINT_TTL_SECONDS):
+    """Delete checkpoints (and temp files of interrupted writes) not written for ``max_age`` seconds"""
+    try:
+        names = os.listdir(checkpoint_dir)
+    except FileNotFoundError:
+        return
+    cutoff = time.time() - max_age
+    for name in names:
+        if not name.endswith(('.json', '.tmp')):
+            continue
+        path = os.path.join(checkpoint_dir, name)
+        try:
+            if os.stat(path).st_mtime < cutoff:
+                os.remove(path)
+                debug_log(f"[CHECKPOINT] removed expired {name}")
+        except FileNotFoundError:
+            continue
+
+
+def load_checkpoint(path):
+    """Read a parse checkpoint, or None if there is none (or it is unreadable)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Warning: ignoring unreadable checkpoint {path}: {e}", file=sys.stderr)
+        return None
+    if not isinstance(checkpoint, dict) or 'last_page' not in checkpoint:
+        return None
+    for name in CHECKPOINT_TRANSACTION_LISTS:
+        if name in checkpoint:
+            checkpoint[name] = [Transaction.from_state(state) for state in checkpoint[name]]
+    return checkpoint
+
+
+def save_checkpoint(path, checkpoint):
+    """Write a checkpoint atomically, so a run killed mid-write leaves the previous one intact"""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(checkpoint, f, separators=(',', ':'), default=Transaction.state)
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def parse_ocr_page(page_data, template=None, initial_balance=None):
+    """Parse a scanned page from tesseract's word boxes.
+
+    The boxes are rebuilt into a table grid by ``words_to_cell_rows`` and
+    handed to ``parse_bank_table`` with the column headers as its header row,
+    so column positions - not line heuristics - decide which amount is the
+    credit and which the balance. Pages whose grid can't be built (no header
+    seen yet, no numpy) fall back to ``detect_table_rows`` on the OCR text.
+    Returns ``(transactions, template, last_balance)``.
+    """
+    page_number = page_data.get('page_number')
+    profile = bank_profile_for(page_data.get('statement_format'))
+    rows = []
+    if NUMPY_AVAILABLE and page_data.get('words'):
+        rows, template = words_to_cell_rows(page_data, template)
+
+    if rows:
+        transactions = parse_bank_table(
+            rows, template['headers'], page_number=page_number, table_index=0, profile=profile,
+        )
+        if transactions:
+            last_balance = initial_balance
+            if 'balance' in template['roles']:
+                balance_band = template['roles'].index('balance')
+                balances = [parse_word_amount(row[balance_band]) for row in rows]
+                balances = [balance for balance in balances if balance is not None]
+                if balances:
+                    last_balance = balances[-1]
+            return transactions, template, last_balance
+
+    page_text = page_data.get('text') or ""
+    if len(page_text) > 50:
+        transactions, last_balance = detect_table_rows(
+            page_text,
+            page_number=page_number,
+            initial_balance=initial_balance,
+            profile=profile,
+            first_line_index=page_data.get('line_offset', 0),
+        )
+        return transactions, template, last_balance
+    return [], template, initial_balance
+
+
+def merge_page_transactions(transactions, page_transactions):
+    """Insert OCR'd pages' rows into a parsed statement at their page position"""
+    merged = list(transactions)
+    for page_number in sorted({t.page_number or 0 for t in page_transactions}):
+        rows = [t for t in page_transactions if (t.page_number or 0) == page_number]
+        position = next(
+            (i for i, t in enumerate(merged) if (t.page_number or 0) > page_number),
+            len(merged),
+        )
+        merged[position:position] = rows
+    return merged
+
+
+def parse_pdf_pages(pages, stats=None, extraction_plan=None, resume=None, on_page=None, on_rows=None):
+    """Parse a stream of extracted pages (see ``iter_pdf_pages``) into transactions.
+
+    Bank pages are parsed as soon as they arrive and then dropped; so are
+    paybill pages, once a table with the export's header has been seen
+    (``parse_paybill_page``). Pages that
+    arrive pre-parsed from ``iter_pdf_pages_parallel`` are reused when their
+    starting balance matches the balance carried from the previous page.
+
+    For bank statements both the text and the table parser run on the first
+    ``PATH_SAMPLE_PAGES`` pages that produce transactions. If one of them
+    clearly wins (``choose_bank_path``) only that parser runs on the rest of
+    the document, and ``extraction_plan`` - shared with ``iter_pdf_pages`` -
+    is updated so the losing side is not even extracted. Ambiguous samples
+    keep both parsers and merge at the end.
+
+    Pages carrying ``words`` (``--bank-engine words``) go through
+    ``parse_bank_words`` instead, with the column template found on the first
+    page reused for the rest of the statement.
+
+    Scanned pages (``'ocr': True``) are parsed by ``parse_ocr_page``,
+    whichever path the rest of the statement takes, and their rows are merged
+    back in at their page position.
+
+    ``on_page(checkpoint)`` is called after every page with the complete
+    parse state so far (what ``save_checkpoint`` writes); passing
+    such a checkpoint back as ``resume`` continues the parse from where it
+    stopped, given the pages after ``checkpoint['last_page']``.
+
+    ``on_rows(transactions)`` receives the returned transactions in order, in
+    batches, as soon as their place in the result is settled: after every page
+    of a paybill export (from its first header table on) and of a bank
+    statement once its path is text, table or words. Dual-path statements,
+    whose text and table rows are merged over the whole document, and
+    statements that end inside the path sample are written at the end.
+    """
+    stats = stats if stats is not None else {}
+    stats.setdefault('pages', 0)
+    stats.setdefault('text_length', 0)
+    stats.setdefault('tables', 0)
+    stats.setdefault('is_paybill', False)
+    stats.setdefault('statement_format', FORMAT_UNKNOWN)
+    stats.setdefault('table_strategy', None)
+    stats.setdefault('bank_path', None)
+    stats.setdefault('ocr_pages', 0)
+    stats.setdefault('ocr_cache_hits', 0)
+    stats.setdefault('ocr_cache_misses', 0)
+    stats.setdefault('date_format', None)
+
+    paybill = new_paybill_state()
+    paybill_transactions = []
+    text_transactions = []
+    table_transactions = []
+    last_balance = None
+    bank_path = None
+    sampled_pages = 0
+    word_transactions = []
+    ocr_transactions = []
+    column_template = None
+    ocr_template = None
+    last_page = 0
+
+    if resume is not None:
+        stats.update(resume['stats'])
+        paybill = resume['paybill']
+        paybill_transactions = resume['paybill_transactions']
+        text_transactions = resume['text_transactions']
+        table_transactions = resume['table_transactions']
+        word_transactions = resume['word_transactions']
+        ocr_transactions = resume.get('ocr_transactions', [])
+        last_balance = resume['last_balance']
+        bank_path = resume['bank_path']
+        sampled_pages = resume['sampled_pages']
+        column_template = resume['column_template']
+        ocr_template = resume.get('ocr_template')
+        last_page = resume['last_page']
+        if extraction_plan is not None and bank_path in (BANK_PATH_TEXT, BANK_PATH_TABLE):
+            extraction_plan['text'] = bank_path != BANK_PATH_TABLE
+            extraction_plan['tables'] = bank_path != BANK_PATH_TEXT
+
+    use_date_format(None)
+    if stats['date_format'] is not None:
+        use_date_format(stats['date_format'], bank_profile_for(stats['statement_format']).date_formats)
+
+    # Rows passed to on_rows so far: all of them, and how many of the chosen path's and of the OCR rows
+    emitted = emitted_path = emitted_ocr = 0
+
+    def emit_settled_rows():
+        # Pages arrive in order, so once the path is fixed every row parsed so
+        # far precedes the rows of later pages; the path's rows and the OCR
+        # rows are merged by page as merge_page_transactions would
+        nonlocal emitted, emitted_path, emitted_ocr
+        if stats['is_paybill']:
+            path_rows = paybill_transactions
+        else:
+            path_rows = {
+                BANK_PATH_TEXT: text_transactions,
+                BANK_PATH_TABLE: table_transactions,
+                BANK_PATH_WORDS: word_transactions,
+            }.get(bank_path)
+        if path_rows is None:
+            return
+        rows = []
+        while emitted_path < len(path_rows) or emitted_ocr < len(ocr_transactions):
+            if emitted_ocr == len(ocr_transactions) or (
+                emitted_path < len(path_rows)
+                and (path_rows[emitted_path].page_number or 0) <= (ocr_transactions[emitted_ocr].page_number or 0)
+            ):
+                rows.append(path_rows[emitted_path])
+                emitted_path += 1
+            else:
+                rows.append(ocr_transactions[emitted_ocr])
+                emitted_ocr += 1
+        if rows:
+            emitted += len(rows)
+            on_rows(rows)
+
+    def pages_then_emit(source):
+        # Settled rows go out after each page is parsed, before the next one is extracted
+        for page_data in source:
+            yield page_data
+            emit_settled_rows()
+
+    if on_rows is not None:
+        pages = pages_then_emit(pages)
+
+    for page_data in pages:
+        if on_page is not None and last_page:
+            on_page({
+                'last_page': last_page,
+                'stats': stats,
+                'paybill': paybill,
+                'paybill_transactions': paybill_transactions,
+                'text_transactions': text_transactions,
+                'table_transactions': table_transactions,
+                'word_transactions': word_transactions,
+                'ocr_transactions': ocr_transactions,
+                'last_balance': last_balance,
+                'bank_path': bank_path,
+                'sampled_pages': sampled_pages,
+                'column_template': column_template,
+                'ocr_template': ocr_template,
+            })
+        last_page = page_data.get('page_number', last_page + 1)
+        stats['pages'] += 1
+        stats['text_length'] += len(page_data.get('text') or "")
+        stats['tables'] += len(page_data.get('tables', []))
+        stats['statement_format'] = page_data.get('statement_format', stats['statement_format'])
+        if stats['table_strategy'] is None:
+            stats['table_strategy'] = page_data.get('table_strategy')
+
+        if page_data.get('is_paybill'):
+            stats['is_paybill'] = True
+            paybill_transactions.extend(parse_paybill_page(page_data.get('tables', []), paybill, stats))
+            continue
+
+        if stats['date_format'] is None:
+            stats['date_format'] = infer_page_date_format(page_data)
+
+        if page_data.get('ocr'):
+            stats['ocr_pages'] += 1
+            if page_data.get('ocr_cached') is True:
+                stats['ocr_cache_hits'] += 1
+            elif page_data.get('ocr_cached') is False:
+                stats['ocr_cache_misses'] += 1
+            page_transactions, ocr_template, last_balance = parse_ocr_page(page_data, ocr_template, last_balance)
+            ocr_transactions.extend(page_transactions)
+            continue
+
+        if 'words' in page_data:
+            page_transactions, column_template = parse_bank_words(page_data, column_template)
+            word_transactions.extend(page_transactions)
+            bank_path = BANK_PATH_WORDS
+            stats['bank_path'] = bank_path
+            stats.setdefault('path_sample_pages', stats['pages'])
+            continue
+
+        parse_text = bank_path != BANK_PATH_TABLE
+        parse_tables = bank_path != BANK_PATH_TEXT
+
+        if 'text_transactions' in page_data and page_data.get('initial_balance') == last_balance:
+            # Pre-parsed by a worker with the right carried balance
+            page_text_transactions = page_data['text_transactions'] if parse_text else []
+            page_table_transactions = page_data['table_transactions'] if parse_tables else []
+            last_balance = page_data['last_balance']
+        else:
+            page_text_transactions, page_table_transactions, last_balance = parse_bank_page(
+                page_data,
+                initial_balance=last_balance,
+                parse_text=parse_text,
+                parse_tables=parse_tables,
+            )
+        text_transactions.extend(page_text_transactions)
+        table_transactions.extend(page_table_transactions)
+
+        if bank_path is None and (text_transactions or table_transactions):
+            sampled_pages += 1
+            if sampled_pages >= PATH_SAMPLE_PAGES:
+                bank_path = choose_bank_path(text_transactions, table_transactions)
+                stats['bank_path'] = bank_path
+                stats['path_sample_pages'] = stats['pages']
+                if extraction_plan is not None:
+                    extraction_plan['text'] = bank_path != BANK_PATH_TABLE
+                    extraction_plan['tables'] = bank_path != BANK_PATH_TEXT
+
+    if stats['is_paybill']:
+        paybill_transactions.extend(finish_paybill(paybill, stats))
+        transactions = paybill_transactions
+    else:
+        transactions = select_path_transactions(bank_path, text_transactions, table_transactions, word_transactions, stats)
+        if ocr_transactions:
+            transactions = merge_page_transactions(transactions, ocr_transactions)
+    if on_rows is not None and len(transactions) > emitted:
+        on_rows(transactions[emitted:])
+    return transactions
+
+
+def select_path_transactions(bank_path, text_transactions, table_transactions, word_transactions, stats):
+    """Final bank transactions for the chosen (or, if undecided, scored) parsing path"""
+    if bank_path is None:
+        # Document ended inside the sample window: score everything that was read
+        bank_path = choose_bank_path(text_transactions, table_transactions)
+        stats['bank_path'] = bank_path
+        stats['path_sample_pages'] = stats['pages']
+
+    if bank_path == BANK_PATH_WORDS:
+        return word_transactions
+    if bank_path == BANK_PATH_TEXT:
+        return list(text_transactions)
+    if bank_path == BANK_PATH_TABLE:
+        return list(table_transactions)
+    return select_bank_transactions(text_transactions, table_transactions)
+
+
 def main():
     parser = argparse.ArgumentParser(description='Extract transactions from PDF bank statement')
     parser.add_argument('pdf_path', help='Path to PDF file')
     parser.add_argument('--output', help='Output JSON file path', default=None)
+    parser.add_argument('--format', choices=[OUTPUT_JSON, OUTPUT_NDJSON], default=OUTPUT_JSON,
+                        help='json: one array written at the end; ndjson: one transaction per line as pages '
+                             'are parsed (dual-path bank statements, whose text and table rows are merged over '
+                             'the whole document, are written at the end), then a {"summary": ...} line')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Parallel page workers (0 = one per CPU core)')
+    parser.add_argument('--cache-dir', default=os.environ.get('PARSE_CACHE_DIR'),
+                        help='Directory for the extraction cache (default: $PARSE_CACHE_DIR, disabled if unset)')
+    parser.add_argument('--cache-max-mb', type=int, default=int(os.environ.get('PARSE_CACHE_MAX_MB', '512')),
+                        help='Evict least recently used cache entries above this size')
+    parser.add_argument('--bank-engine', choices=[BANK_ENGINE_HEURISTIC, BANK_ENGINE_WORDS],
+                        default=BANK_ENGINE_HEURISTIC,
+                        help='Bank statement parser: text/table heuristics, or column bands from word coordinates')
+    parser.add_argument('--pages', default=None,
+                        help='Only parse these pages, e.g. 120-240 or 1-10,40- (1-based, inclusive)')
+    parser.add_argument('--checkpoint-dir', default=os.environ.get('PARSE_CHECKPOINT_DIR'),
+                        help='Write resumable progress here every few pages and resume from it on restart '
+                             '(default: $PARSE_CHECKPOINT_DIR, disabled if unset)')
+    parser.add_argument('--ocr-profile', choices=sorted(OCR_PROFILES),
+                        default=os.environ.get('PARSE_OCR_PROFILE', OCR_DEFAULT_PROFILE),
+                        help='DPI and image preprocessing for OCR (default: $PARSE_OCR_PROFILE or '
+                             f'{OCR_DEFAULT_PROFILE})')
     
     args = parser.parse_args()
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    bank_engine = args.bank_engine
+    if bank_engine == BANK_ENGINE_WORDS and not NUMPY_AVAILABLE:
+        print("Warning: numpy is not installed, using the heuristic bank engine", file=sys.stderr)
+        bank_engine = BANK_ENGINE_HEURISTIC
+    words_plan = {'text': False, 'tables': False, 'words': True} if bank_engine == BANK_ENGINE_WORDS else None
     
     pdf_path = Path(args.pdf_path)
     if not pdf_path.exists():
         print(f"Error: PDF file not found: {pdf_path}", file=sys.stderr)
         sys.exit(1)
-    
-    # Try pdfplumber first
-    result = extract_text_from_pdf_pdfplumber(str(pdf_path))
-    
-    transactions = []
-    
-    if result:
-        pages = result.get('pages', [])
-        
-        if result['is_paybill']:
-            paybill_tables = []
-            for page in pages:
-                for table in page.get('tables', []):
-                    paybill_tables.append(table)
-            transactions = parse_paybill_table(paybill_tables)
-        else:
-            text_transactions = []
-            table_transactions = []
-
-            # Text-based extraction per page
-            last_balance = None
-            for page in pages:
-                page_number = page.get('page_number')
-                page_text = page.get('text') or ""
-                if page_text and len(page_text) > 50:
-                    detected, last_balance = detect_table_rows(
-                        page_text,
-                        page_number=page_number,
-                        initial_balance=last_balance,
-                    )
-                    text_transactions.extend(detected)
-
-            # Table extraction per page
-            for page in pages:
-                page_number = page.get('page_number')
-                tables = page.get('tables', [])
-                for table_index, table in enumerate(tables):
-                    if isinstance(table, dict):
-                        rows = table.get('rows') or []
-                        header_row = table.get('header')
-                        table_page = table.get('page_number', page_number)
-                    else:
-                        rows = table or []
-                        header_row = table[0] if table else None
-                        table_page = page_number
 
-                    if not rows:
-                        continue
+    page_numbers = None
+    if args.pages:
+        try:
+            with pdfplumber.open(str(pdf_path)) as pdf:
+                page_numbers = parse_page_ranges(args.pages, len(pdf.pages))
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+    requested_pages = page_numbers
+
+    checkpoint_path = None
+    resume = None
+    table_strategy = None
+    if args.checkpoint_dir:
+        try:
+            prune_checkpoints(args.checkpoint_dir)
+        except OSError as e:
+            print(f"Warning: could not prune checkpoints: {e}", file=sys.stderr)
+        checkpoint_path = checkpoint_path_for(args.checkpoint_dir, str(pdf_path), bank_engine, args.pages)
+        resume = load_checkpoint(checkpoint_path)
+        if resume is not None:
+            if page_numbers is None:
+                with pdfplumber.open(str(pdf_path)) as pdf:
+                    page_numbers = list(range(1, len(pdf.pages) + 1))
+            page_numbers = [number for number in page_numbers if number > resume['last_page']]
+            # Later pages keep the table strategy the interrupted run calibrated
+            table_strategy = table_strategy_named(resume['stats'].get('table_strategy'))
+            print(f"Resuming from checkpoint after page {resume['last_page']}", file=sys.stderr)
+
+    if resume is None and page_numbers and page_numbers[0] > 1 and bank_engine == BANK_ENGINE_HEURISTIC:
+        try:
+            start_balance = carried_balance_before(str(pdf_path), page_numbers[0])
+        except Exception as e:
+            print(f"Warning: could not read the balance before page {page_numbers[0]}: {e}", file=sys.stderr)
+            start_balance = None
+        if start_balance is not None:
+            resume = {
+                'last_page': page_numbers[0] - 1,
+                'stats': {},
+                'paybill': new_paybill_state(),
+                'paybill_transactions': [],
+                'text_transactions': [],
+                'table_transactions': [],
+                'word_transactions': [],
+                'last_balance': start_balance,
+                'bank_path': None,
+                'sampled_pages': 0,
+                'column_template': None,
+            }
 
-                    table_transactions.extend(
-                        parse_bank_table(
-                            rows,
-                            header_row,
-                            page_number=table_page,
-                            table_index=table_index
-                        )
-                    )
+    def write_checkpoint(checkpoint):
+        if checkpoint['stats']['pages'] % CHECKPOINT_EVERY_PAGES:
+            return
+        try:
+            save_checkpoint(checkpoint_path, checkpoint)
+            debug_log(f"[CHECKPOINT] saved after page {checkpoint['last_page']}")
+        except Exception as e:
+            print(f"Warning: could not write checkpoint: {e}", file=sys.stderr)
 
-            transactions = list(text_transactions)
+    # --format ndjson: rows are written as parse_pdf_pages settles them
+    ndjson_file = None
+    rows_written = 0
+    if args.format == OUTPUT_NDJSON:
+        ndjson_file = open(args.output, 'w') if args.output else sys.stdout
 
-            if table_transactions:
-                table_has_complete = all(
-                    len(t.get('particulars', '')) > 15 and not t.get('particulars', '').startswith('---')
-                    for t in table_transactions[:10]
-                )
+    def write_rows(rows):
+        nonlocal rows_written
+        write_ndjson(ndjson_file, transactions_for_json(rows))
+        rows_written += len(rows)
 
-                if table_has_complete and len(table_transactions) > len(text_transactions):
-                    transactions = table_transactions
-                elif not text_transactions:
-                    transactions = table_transactions
-                else:
-                    seen_keys = {
-                        (t.get('tran_date'), t.get('credit'), t.get('debit'), t.get('particulars'))
-                        for t in transactions
-                    }
-                    for entry in table_transactions:
-                        key = (entry.get('tran_date'), entry.get('credit'), entry.get('debit'), entry.get('particulars'))
-                        if key not in seen_keys:
-                            transactions.append(entry)
-                            seen_keys.add(key)
+    on_rows = write_rows if ndjson_file is not None else None
+
+    # Try pdfplumber first, parsing pages as they are streamed out of the PDF
+    stats = {}
+    parsed = False
+    try:
+        cache = None
+        pages = None
+        extraction_plan = None
+        if args.cache_dir:
+            try:
+                cache = DiskCache(args.cache_dir, max_bytes=args.cache_max_mb * 1024 * 1024)
+                cache_key = extraction_cache_key(
+                    str(pdf_path), ('words',) if words_plan else ('text', 'tables'), args.ocr_profile,
+                )
+                pages = load_cached_pages(cache, cache_key)
+                debug_log(f"[CACHE] extraction {'hit' if pages is not None else 'miss'} {cache_key}")
+                if pages is not None and page_numbers is not None:
+                    wanted = set(page_numbers)
+                    pages = [page_data for page_data in pages if page_data.get('page_number') in wanted]
+            except OSError as e:
+                print(f"Warning: extraction cache unavailable: {e}", file=sys.stderr)
+                cache = None
+
+        # Only whole-document extractions are stored in the cache
+        record = cache is not None and page_numbers is None
+        if pages is None and page_numbers == []:
+            pages = []
+        elif pages is None:
+            if workers > 1:
+                pages = iter_pdf_pages_parallel(str(pdf_path), workers, cache=cache,
+                                                extraction_plan=words_plan, page_numbers=page_numbers,
+                                                ocr_profile=args.ocr_profile, table_strategy=table_strategy)
+            elif words_plan is not None:
+                pages = iter_pdf_pages(str(pdf_path), page_numbers=page_numbers, cache=cache,
+                                       extraction_plan=words_plan, ocr_profile=args.ocr_profile)
+            elif record:
+                # Cached extractions must stay complete, so both sides are always extracted
+                pages = iter_pdf_pages(str(pdf_path), cache=cache, ocr_profile=args.ocr_profile)
+            else:
+                extraction_plan = {'text': True, 'tables': True}
+                pages = iter_pdf_pages(str(pdf_path), page_numbers=page_numbers, cache=cache,
+                                       extraction_plan=extraction_plan, ocr_profile=args.ocr_profile,
+                                       table_strategy=table_strategy)
+            if record:
+                pages = record_extracted_pages(pages, cache, cache_key)
+
+        transactions = parse_pdf_pages(
+            pages,
+            stats,
+            extraction_plan=extraction_plan,
+            resume=resume,
+            on_page=write_checkpoint if checkpoint_path else None,
+            on_rows=on_rows,
+        )
+        parsed = True
+        if stats.get('bank_path'):
+            debug_log(
+                f"[PATH] bank statement path: {stats['bank_path']} "
+                f"(decided after {stats.get('path_sample_pages')} of {stats['pages']} pages)"
+            )
+    except Exception as e:
+        print(f"Error extracting with pdfplumber: {e}", file=sys.stderr)
+        transactions = []
     
     # Fallback to OCR if pdfplumber didn't work or returned little content
-    if not transactions and OCR_AVAILABLE:
+    # (unless every page was already OCR'd as a scanned page, or streamed rows can't be taken back)
+    all_pages_ocr = stats.get('pages') and stats.get('ocr_pages') == stats.get('pages')
+    if not transactions and OCR_AVAILABLE and not all_pages_ocr and not rows_written:
         print("Falling back to OCR...", file=sys.stderr)
-        ocr_text = extract_text_from_pdf_ocr(str(pdf_path))
-        if ocr_text and len(ocr_text) > 100:
-            transactions, _ = detect_table_rows(ocr_text, page_number=None)
+        try:
+            ocr_stats = {}
+            transactions = parse_pdf_pages(
+                iter_ocr_page_data(str(pdf_path), workers, requested_pages, cache, args.ocr_profile),
+                ocr_stats,
+                on_rows=on_rows,
+            )
+            for counter in ('ocr_cache_hits', 'ocr_cache_misses'):
+                stats[counter] = stats.get(counter, 0) + ocr_stats[counter]
+        except Exception as e:
+            print(f"Error with OCR: {e}", file=sys.stderr)
+            transactions = []
+
+    if stats.get('ocr_cache_hits') or stats.get('ocr_cache_misses'):
+        debug_log(f"[OCR] cache: {stats['ocr_cache_hits']} hits, {stats['ocr_cache_misses']} misses")
+    # Dates parsed in this process (worker processes keep their own counts)
+    stats['date_fast'] = DATE_PARSE_COUNTS['fast']
+    stats['date_fallbacks'] = DATE_PARSE_COUNTS['fallback']
+    stats['date_memo_hits'] = _parse_date_memo.cache_info().hits
+    if stats['date_fast'] or stats['date_fallbacks']:
+        debug_log(
+            f"[DATES] {stats['date_fast']} via {stats.get('date_format')}, {stats['date_fallbacks']} fallback searches, "
+            f"{stats['date_memo_hits']} memo hits"
+        )
+    if stats.get('paybill_rows'):
+        debug_log(
+            f"[PAYBILL] {stats['paybill_rows']} rows, {stats['paybill_fallback_rows']} scanned by the fallback "
+            f"({paybill_fallback_rate(stats):.1%})"
+        )
     
     # Output JSON
-    output_json = json.dumps(transactions, indent=2)
-    
+    if ndjson_file is not None:
+        write_ndjson(ndjson_file, [ndjson_summary(stats, rows_written, rows_written == len(transactions))])
+        if ndjson_file is not sys.stdout:
+            ndjson_file.close()
+    else:
+        output_json = json.dumps(transactions_for_json(transactions), indent=2)
+        if args.output:
+            with open(args.output, 'w') as f:
+                f.write(output_json)
+        else:
+            print(output_json)
+
     if args.output:
-        with open(args.output, 'w') as f:
-            f.write(output_json)
-        
         # Also write debug text
         debug_path = args.output.replace('.json', '_debug.txt')
+        if debug_path == args.output:
+            debug_path = args.output + '_debug.txt'
         with open(debug_path, 'w') as f:
             f.write(f"Extracted {len(transactions)} transactions\n\n")
-            if result:
-                f.write(f"Text length: {len(result.get('text', ''))}\n")
-                f.write(f"Tables found: {len(result.get('tables', []))}\n")
-                f.write(f"Is Paybill: {result.get('is_paybill', False)}\n")
-    else:
-        print(output_json)
+            if stats:
+                f.write(f"Pages: {stats.get('pages', 0)}\n")
+                f.write(f"Text length: {stats.get('text_length', 0)}\n")
+                f.write(f"Tables found: {stats.get('tables', 0)}\n")
+                f.write(f"Is Paybill: {stats.get('is_paybill', False)}\n")
+                f.write(f"Statement format: {stats.get('statement_format', FORMAT_UNKNOWN)}\n")
+                f.write(f"Table strategy: {stats.get('table_strategy')}\n")
+                f.write(
+                    f"Bank path: {stats.get('bank_path')} "
+                    f"(decided after {stats.get('path_sample_pages')} of {stats.get('pages', 0)} pages)\n"
+                )
+                f.write(f"OCR pages: {stats.get('ocr_pages', 0)}\n")
+                f.write(f"OCR cache: {stats.get('ocr_cache_hits', 0)} hits, {stats.get('ocr_cache_misses', 0)} misses\n")
+                f.write(f"Date format: {stats.get('date_format')}\n")
+                f.write(
+                    f"Dates: {stats.get('date_fast', 0)} fast, {stats.get('date_fallbacks', 0)} fallback searches, "
+                    f"{stats.get('date_memo_hits', 0)} memo hits\n"
+                )
+                if stats.get('paybill_rows'):
+                    f.write(
+                        f"Paybill rows: {stats['paybill_rows']}, {stats['paybill_fallback_rows']} fallback "
+                        f"({paybill_fallback_rate(stats):.1%})\n"
+                    )
+
+    if checkpoint_path and parsed:
+        # The statement was parsed to the end; a later run should start from scratch
+        try:
+            os.remove(checkpoint_path)
+        except FileNotFoundError:
+            pass
     
     sys.exit(0)
 
 
 if __name__ == '__main__':
     main()
-